@@ -0,0 +1,588 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import sys
+import json
+import time
+import uuid
+import zlib
+import struct
+import sqlite3
+import argparse
+import inspect
+import platform
+import tempfile
+import statistics
+
+import cv2
+import numpy as np
+
+from csp_tool import CspTool
+
+# 計測項目一覧
+BENCHMARK_LIST = [
+    'open',
+    'metadata',
+    'single_layer_decode',
+    'all_layer_decode',
+]
+
+# ブロック(タイル)関連の定数
+# ※1ブロック：256×256のアルファ画像 + 256×256×4(BGRA)の画像
+BLOCK_WIDTH = 256
+BLOCK_HEIGHT = 256
+BLOCK_UNCOMPRESSED_SIZE = BLOCK_WIDTH * BLOCK_HEIGHT * 5
+
+# レイヤー種別(LayerType)
+LAYER_TYPE_RASTER = 1
+LAYER_TYPE_ROOT_FOLDER = 256
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark CspTool with a synthetic .clip file')
+
+    parser.add_argument('--width', type=int, default=2048)
+    parser.add_argument('--height', type=int, default=2048)
+    parser.add_argument('--layers', type=int, default=8)
+    parser.add_argument(
+        '--sparsity',
+        type=float,
+        default=0.5,
+        help='ratio of empty tiles (0.0 - 1.0)',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--decode_workers', type=int, default=None)
+    parser.add_argument('--use_mmap', action='store_true')
+    parser.add_argument('--lazy_load', action='store_true')
+    parser.add_argument(
+        '--work_dir',
+        type=str,
+        default=None,
+        help='directory for the synthetic .clip (default: temporary)',
+    )
+    parser.add_argument('--label', type=str, default=None)
+    parser.add_argument(
+        '--output',
+        type=str,
+        default=None,
+        help='JSON output path (default: stdout)',
+    )
+
+    args = parser.parse_args()
+
+    return args
+
+
+def create_block_record(block_index, block_zlib_data=None):
+    # BlockDataBeginChunk ～ BlockDataEndChunk のブロックレコードを作成
+    # ※block_zlib_dataがNoneの場合は空ブロック(存在フラグ0)
+    begin_name = 'BlockDataBeginChunk'.encode('utf-16-be')
+    end_name = 'BlockDataEndChunk'.encode('utf-16-be')
+
+    exist_flag = 0 if block_zlib_data is None else 1
+    block_data = struct.pack(
+        '>5L',
+        block_index,
+        BLOCK_UNCOMPRESSED_SIZE,
+        BLOCK_WIDTH,
+        BLOCK_HEIGHT,
+        exist_flag,
+    )
+    if block_zlib_data is not None:
+        # ブロック長さ(ビッグエンディアン)、ブロック長さ2(リトルエンディアン)
+        block_data += struct.pack('>L', len(block_zlib_data) + 4)
+        block_data += struct.pack('<L', len(block_zlib_data))
+        block_data += block_zlib_data
+
+    end_record = struct.pack('>L', len(end_name) // 2) + end_name
+
+    # ※先頭4バイトのサイズは、終了レコードまでを含むレコード全体のサイズ
+    record_size = 8 + len(begin_name) + len(block_data) + len(end_record)
+    begin_record = struct.pack('>LL', record_size, len(begin_name) // 2)
+    begin_record += begin_name + block_data
+
+    return begin_record + end_record
+
+
+def create_block_data(rng, layer_index, block_x, block_y):
+    # 描画済みブロックのデータ(アルファ画像 + BGRA画像)を作成
+    # ※グラデーションに弱いノイズを加え、実データに近い圧縮率とする
+    y, x = np.mgrid[0:BLOCK_HEIGHT, 0:BLOCK_WIDTH]
+    gradient = (x + y + (block_x + block_y) * BLOCK_WIDTH) // 8
+    noise = rng.integers(0, 4, size=(BLOCK_HEIGHT, BLOCK_WIDTH, 4))
+
+    bgra = np.empty((BLOCK_HEIGHT, BLOCK_WIDTH, 4), dtype=np.uint8)
+    bgra[:, :, 0] = (gradient + layer_index * 40) % 256
+    bgra[:, :, 1] = (gradient * 2 + layer_index * 80) % 256
+    bgra[:, :, 2] = (255 - gradient) % 256
+    bgra[:, :, 3] = 0
+    bgra = (bgra + noise).astype(np.uint8)
+    alpha = np.full((BLOCK_HEIGHT, BLOCK_WIDTH), 255, dtype=np.uint8)
+
+    return alpha.tobytes() + bgra.tobytes()
+
+
+def create_external_chunk(external_id, block_record_list):
+    # CHNKExtaチャンク
+    # ※チャンクサイズ、External IDサイズ、External ID、Externalデータサイズ、
+    #   ブロックレコードの順
+    external_id = external_id.encode()
+    external_data = b''.join(block_record_list)
+
+    chunk_body = struct.pack('>Q', len(external_id)) + external_id
+    chunk_body += struct.pack('>Q', len(external_data)) + external_data
+
+    return b'CHNKExta' + struct.pack('>Q', len(chunk_body)) + chunk_body
+
+
+def create_sqlite_data(
+    canvas_width,
+    canvas_height,
+    layer_info_list,
+    canvas_preview_data,
+    external_chunk_list,
+):
+    # CspToolが参照するテーブルを持つSQLiteデータベースを作成し、バイト列で返す
+    # ※sqlite3.Connection.serialize()はPython 3.11以降のため一時ファイルを経由
+    temp_db_fd, temp_db_filename = tempfile.mkstemp(suffix='.db')
+    os.close(temp_db_fd)
+    try:
+        connect = sqlite3.connect(temp_db_filename)
+        connect.executescript('''
+            CREATE TABLE Canvas(_PW_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                MainId INTEGER, CanvasWidth REAL, CanvasHeight REAL,
+                CanvasRootFolder INTEGER);
+            CREATE TABLE CanvasPreview(_PW_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                MainId INTEGER, CanvasId INTEGER, ImageType INTEGER,
+                ImageWidth INTEGER, ImageHeight INTEGER, ImageData BLOB);
+            CREATE TABLE Layer(_PW_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                MainId INTEGER, CanvasId INTEGER, LayerName TEXT,
+                LayerType INTEGER, LayerFolder INTEGER,
+                LayerVisibility INTEGER, LayerOpacity INTEGER,
+                LayerComposite INTEGER, LayerClip INTEGER,
+                LayerNextIndex INTEGER, LayerFirstChildIndex INTEGER,
+                LayerUuid TEXT, LayerRenderMipmap INTEGER,
+                LayerLayerMaskMipmap INTEGER, LayerRenderThumbnail INTEGER);
+            CREATE TABLE LayerThumbnail(_PW_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                MainId INTEGER, CanvasId INTEGER, LayerId INTEGER,
+                ThumbnailCanvasWidth INTEGER, ThumbnailCanvasHeight INTEGER,
+                ThumbnailOffscreen INTEGER);
+            CREATE TABLE Offscreen(_PW_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                MainId INTEGER, CanvasId INTEGER, LayerId INTEGER,
+                Attribute BLOB, BlockData BLOB);
+            CREATE TABLE Mipmap(_PW_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                MainId INTEGER, CanvasId INTEGER, LayerId INTEGER,
+                MipmapCount INTEGER, BaseMipmapInfo INTEGER);
+            CREATE TABLE MipmapInfo(_PW_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                MainId INTEGER, CanvasId INTEGER, LayerId INTEGER,
+                ThisScale REAL, Offscreen INTEGER, NextIndex INTEGER);
+            CREATE TABLE ExternalChunk(ExternalID BLOB, Offset INTEGER);
+            CREATE INDEX 'idxLayer' on Layer(MainId);
+            CREATE INDEX 'idxLayerThumbnail' on LayerThumbnail(MainId);
+            CREATE INDEX 'idxOffscreen' on Offscreen(MainId);
+            CREATE INDEX 'idxMipmap' on Mipmap(MainId);
+            CREATE INDEX 'idxMipmapInfo' on MipmapInfo(MainId);
+        ''')
+
+        canvas_id = 1
+        root_layer_id = layer_info_list[0]['layer_id']
+        connect.execute(
+            'INSERT INTO Canvas(MainId, CanvasWidth, CanvasHeight, '
+            'CanvasRootFolder) VALUES (?, ?, ?, ?)',
+            (canvas_id, canvas_width, canvas_height, root_layer_id),
+        )
+        connect.execute(
+            'INSERT INTO CanvasPreview(MainId, CanvasId, ImageType, '
+            'ImageWidth, ImageHeight, ImageData) VALUES (?, ?, ?, ?, ?, ?)',
+            (1, canvas_id, 1, canvas_width, canvas_height,
+             canvas_preview_data),
+        )
+
+        # 各レイヤーのレコード
+        # ※Layer → Mipmap → MipmapInfo → Offscreen → External ID の参照関係
+        #   (各テーブルのMainIdはLayer IDと同じ値を使用)
+        # ※実ファイルと同様にフォルダーも参照関係を持つ
+        #   (External IDに対応するチャンクは存在しない)
+        for layer_info in layer_info_list:
+            layer_id = layer_info['layer_id']
+            is_raster = layer_info['layer_type'] == LAYER_TYPE_RASTER
+
+            connect.execute(
+                'INSERT INTO Layer(MainId, CanvasId, LayerName, LayerType, '
+                'LayerFolder, LayerVisibility, LayerOpacity, LayerComposite, '
+                'LayerClip, LayerNextIndex, LayerFirstChildIndex, LayerUuid, '
+                'LayerRenderMipmap, LayerLayerMaskMipmap, '
+                'LayerRenderThumbnail) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    layer_id,
+                    canvas_id,
+                    layer_info['layer_name'],
+                    layer_info['layer_type'],
+                    0 if is_raster else 1,
+                    1,
+                    layer_info['layer_opacity'],
+                    0,
+                    0,
+                    layer_info['next_index'],
+                    layer_info['first_child_index'],
+                    layer_info['layer_uuid'],
+                    layer_id,
+                    0,
+                    layer_id,
+                ),
+            )
+            connect.execute(
+                'INSERT INTO LayerThumbnail(MainId, CanvasId, LayerId, '
+                'ThumbnailCanvasWidth, ThumbnailCanvasHeight, '
+                'ThumbnailOffscreen) VALUES (?, ?, ?, ?, ?, ?)',
+                (layer_id, canvas_id, layer_id, canvas_width, canvas_height,
+                 0),
+            )
+
+            connect.execute(
+                'INSERT INTO Mipmap(MainId, CanvasId, LayerId, MipmapCount, '
+                'BaseMipmapInfo) VALUES (?, ?, ?, ?, ?)',
+                (layer_id, canvas_id, layer_id, 1, layer_id),
+            )
+            connect.execute(
+                'INSERT INTO MipmapInfo(MainId, CanvasId, LayerId, '
+                'ThisScale, Offscreen, NextIndex) VALUES (?, ?, ?, ?, ?, ?)',
+                (layer_id, canvas_id, layer_id, 100.0, layer_id, 0),
+            )
+            connect.execute(
+                'INSERT INTO Offscreen(MainId, CanvasId, LayerId, Attribute, '
+                'BlockData) VALUES (?, ?, ?, ?, ?)',
+                (layer_id, canvas_id, layer_id, None,
+                 layer_info['external_id'].encode()),
+            )
+
+        connect.executemany(
+            'INSERT INTO ExternalChunk(ExternalID, Offset) VALUES (?, ?)',
+            external_chunk_list,
+        )
+
+        connect.commit()
+        connect.close()
+
+        with open(temp_db_filename, mode='rb') as f:
+            sqlite_binary_data = f.read()
+    finally:
+        os.remove(temp_db_filename)
+
+    return sqlite_binary_data
+
+
+def write_synthetic_clip(
+    filepath,
+    canvas_width=2048,
+    canvas_height=2048,
+    layer_count=8,
+    sparsity=0.5,
+    seed=0,
+    layer_opacity=256,
+):
+    # ベンチマーク用の合成 .clip ファイルを作成
+    # ※ルートフォルダー1つと、その配下のラスターレイヤー(layer_count個)で構成
+    # ※sparsity：空ブロック(存在フラグ0)の割合
+    # ※layer_opacity：ラスターレイヤーの不透明度(0～256)
+    # ※同じ引数であれば同じ内容のファイルを作成する
+    rng = np.random.default_rng(seed)
+
+    blocks_per_row = (canvas_width + BLOCK_WIDTH - 1) // BLOCK_WIDTH
+    blocks_per_column = (canvas_height + BLOCK_HEIGHT - 1) // BLOCK_HEIGHT
+    block_count = blocks_per_row * blocks_per_column
+
+    # レイヤー構成(下層から上層の順)
+    root_layer_id = 1
+    layer_info_list = [{
+        'layer_id': root_layer_id,
+        'layer_name': '',
+        'layer_type': LAYER_TYPE_ROOT_FOLDER,
+        'layer_uuid': str(uuid.UUID(bytes=rng.bytes(16))),
+        'layer_opacity': 256,
+        'next_index': 0,
+        'first_child_index': 2 if layer_count > 0 else 0,
+        'external_id': 'extrnlid' + rng.bytes(16).hex().upper(),
+    }]
+    for layer_index in range(layer_count):
+        layer_id = layer_index + 2
+        next_index = layer_id + 1 if layer_index + 1 < layer_count else 0
+        external_id = 'extrnlid' + rng.bytes(16).hex().upper()
+        layer_info_list.append({
+            'layer_id': layer_id,
+            'layer_name': 'Layer {}'.format(layer_index + 1),
+            'layer_type': LAYER_TYPE_RASTER,
+            'layer_uuid': str(uuid.UUID(bytes=rng.bytes(16))),
+            'layer_opacity': layer_opacity,
+            'next_index': next_index,
+            'first_child_index': 0,
+            'external_id': external_id,
+        })
+
+    # ファイル先頭からの書き込み位置を算出しながらチャンクを作成
+    # ※ヘッダー(24バイト) + CHNKHead(16 + 40バイト)
+    chunk_offset = 24 + 16 + 40
+    external_chunk_data_list = []
+    external_chunk_list = []
+    exist_block_count = 0
+    for layer_index, layer_info in enumerate(layer_info_list[1:]):
+        exist_list = rng.random(block_count) >= sparsity
+
+        block_record_list = []
+        for block_index in range(block_count):
+            block_zlib_data = None
+            if exist_list[block_index]:
+                block_data = create_block_data(
+                    rng,
+                    layer_index,
+                    block_index % blocks_per_row,
+                    block_index // blocks_per_row,
+                )
+                block_zlib_data = zlib.compress(block_data, 1)
+                exist_block_count += 1
+            block_record_list.append(
+                create_block_record(block_index, block_zlib_data))
+
+        external_chunk_data = create_external_chunk(
+            layer_info['external_id'],
+            block_record_list,
+        )
+        external_chunk_data_list.append(external_chunk_data)
+        external_chunk_list.append(
+            (layer_info['external_id'].encode(), chunk_offset))
+        chunk_offset += len(external_chunk_data)
+
+    # キャンバスプレビュー(PNG)
+    canvas_preview = np.full((canvas_height, canvas_width, 3),
+                             255,
+                             dtype=np.uint8)
+    _, canvas_preview_data = cv2.imencode('.png', canvas_preview)
+
+    sqlite_binary_data = create_sqlite_data(
+        canvas_width,
+        canvas_height,
+        layer_info_list,
+        canvas_preview_data.tobytes(),
+        external_chunk_list,
+    )
+    sqlite_chunk_offset = chunk_offset
+
+    # ヘッダー、各チャンクを書き込み
+    file_size = (sqlite_chunk_offset + 16 + len(sqlite_binary_data) + 16)
+    with open(filepath, mode='wb') as f:
+        f.write(b'CSFCHUNK' + struct.pack('>QQ', file_size, 24))
+
+        head_data = struct.pack('>QQQ', 256, sqlite_chunk_offset, 16)
+        head_data += uuid.UUID(bytes=rng.bytes(16)).bytes
+        f.write(b'CHNKHead' + struct.pack('>Q', len(head_data)) + head_data)
+
+        for external_chunk_data in external_chunk_data_list:
+            f.write(external_chunk_data)
+
+        f.write(b'CHNKSQLi' + struct.pack('>Q', len(sqlite_binary_data)))
+        f.write(sqlite_binary_data)
+
+        f.write(b'CHNKFoot' + struct.pack('>Q', 0))
+
+    synthetic_clip_info = {
+        'file_size': file_size,
+        'canvas_width': canvas_width,
+        'canvas_height': canvas_height,
+        'layer_count': layer_count,
+        'block_count': block_count * layer_count,
+        'exist_block_count': exist_block_count,
+    }
+
+    return synthetic_clip_info
+
+
+def measure(function, repeat):
+    # 関数をrepeat回実行し、各回の処理時間(秒)を返す
+    elapsed_time_list = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        elapsed_time_list.append(time.perf_counter() - start_time)
+
+    return elapsed_time_list
+
+
+def summarize(elapsed_time_list):
+    summary = {
+        'repeat': len(elapsed_time_list),
+        'min': min(elapsed_time_list),
+        'median': statistics.median(elapsed_time_list),
+        'mean': statistics.mean(elapsed_time_list),
+        'max': max(elapsed_time_list),
+    }
+
+    return summary
+
+
+def get_supported_options(csp_tool_options):
+    # 計測対象のCspToolが対応するオプションのみを抽出
+    # ※過去のバージョンとも比較できるよう、未対応のオプションは指定しない
+    parameter_dict = inspect.signature(CspTool.__init__).parameters
+    supported_options = {}
+    unsupported_option_list = []
+    for option_name, option_value in csp_tool_options.items():
+        if option_value is None or option_value is False:
+            continue
+        if option_name in parameter_dict:
+            supported_options[option_name] = option_value
+        else:
+            unsupported_option_list.append(option_name)
+
+    return supported_options, unsupported_option_list
+
+
+def close_csp_tool(csp_tool):
+    if hasattr(csp_tool, 'close'):
+        csp_tool.close()
+
+
+def run_benchmark(filepath, repeat, **csp_tool_options):
+    # open、メタデータ参照、単一レイヤー解凍、全レイヤー解凍の処理時間を計測
+    # ※過去のバージョンとも比較できるよう、初期バージョンから存在するAPI
+    #   (CspTool(filepath)、get_layer_list()、get_raster_data())のみを使用
+    result_dict = {}
+
+    def open_csp_tool():
+        close_csp_tool(CspTool(filepath, **csp_tool_options))
+
+    result_dict['open'] = measure(open_csp_tool, repeat)
+
+    # メタデータ参照(オープン直後のインスタンスでの初回参照)
+    # ※テーブルを初回アクセス時に読み出すバージョンでは、その読み出しを含む
+    metadata_time_list = []
+    for _ in range(repeat):
+        csp_tool = CspTool(filepath, **csp_tool_options)
+        metadata_time_list += measure(csp_tool.get_layer_list, 1)
+        close_csp_tool(csp_tool)
+    result_dict['metadata'] = metadata_time_list
+
+    csp_tool = CspTool(filepath, **csp_tool_options)
+    layer_list = csp_tool.get_layer_list()
+    raster_layer_list = [
+        layer_data for layer_data in layer_list
+        if layer_data['layer_type'] == LAYER_TYPE_RASTER
+    ]
+
+    def decode_single_layer():
+        if len(raster_layer_list) == 0:
+            return
+        csp_tool.get_raster_data(
+            raster_layer_list[0]['canvas_id'],
+            raster_layer_list[0]['main_id'],
+        )
+
+    result_dict['single_layer_decode'] = measure(decode_single_layer, repeat)
+
+    def decode_all_layer():
+        for layer_data in layer_list:
+            csp_tool.get_raster_data(
+                layer_data['canvas_id'],
+                layer_data['main_id'],
+            )
+
+    result_dict['all_layer_decode'] = measure(decode_all_layer, repeat)
+
+    close_csp_tool(csp_tool)
+
+    return {
+        benchmark: summarize(result_dict[benchmark])
+        for benchmark in BENCHMARK_LIST
+    }
+
+
+def get_environment_info():
+    environment_info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'sqlite': sqlite3.sqlite_version,
+    }
+
+    return environment_info
+
+
+def main():
+    args = get_args()
+
+    csp_tool_options = {
+        'decode_workers': args.decode_workers,
+        'use_mmap': args.use_mmap,
+        'lazy_load': args.lazy_load,
+    }
+    csp_tool_options, unsupported_option_list = get_supported_options(
+        csp_tool_options)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = args.work_dir if args.work_dir is not None else temp_dir
+        os.makedirs(work_dir, exist_ok=True)
+        filepath = os.path.join(
+            work_dir,
+            'synthetic_{}x{}_{}_{}_{}.clip'.format(
+                args.width,
+                args.height,
+                args.layers,
+                args.sparsity,
+                args.seed,
+            ),
+        )
+
+        # 合成ファイル作成
+        start_time = time.perf_counter()
+        synthetic_clip_info = write_synthetic_clip(
+            filepath,
+            canvas_width=args.width,
+            canvas_height=args.height,
+            layer_count=args.layers,
+            sparsity=args.sparsity,
+            seed=args.seed,
+        )
+        generate_time = time.perf_counter() - start_time
+
+        # 計測
+        benchmark_result = run_benchmark(
+            filepath,
+            args.repeat,
+            **csp_tool_options,
+        )
+
+    result = {
+        'label': args.label,
+        'environment': get_environment_info(),
+        'parameters': {
+            'width': args.width,
+            'height': args.height,
+            'layers': args.layers,
+            'sparsity': args.sparsity,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'csp_tool_options': csp_tool_options,
+            'unsupported_options': unsupported_option_list,
+        },
+        'synthetic_clip': synthetic_clip_info,
+        'generate_time': generate_time,
+        'results': benchmark_result,
+    }
+
+    result_json = json.dumps(result, ensure_ascii=False, indent=4)
+    if args.output is None:
+        print(result_json)
+    else:
+        with open(args.output, mode='w', encoding='utf-8') as f:
+            f.write(result_json + '\n')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
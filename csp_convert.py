@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from csp_tool import CspTool
+
+# 処理フェーズ一覧
+PHASE_LIST = ['open', 'thumbnail', 'metadata', 'raster', 'write']
+
+# 変換完了マーカー(出力モードを記録し、全出力の最後に書き込む)
+MARKER_FILENAME = 'convert.json'
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='Convert .clip files to thumbnail/layer PNG and JSON')
+
+    parser.add_argument(
+        'inputs',
+        nargs='+',
+        help='.clip file, directory, or glob pattern',
+    )
+    parser.add_argument('--output', type=str, default='output')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true')
+    parser.add_argument('--no_raster', action='store_true')
+
+    args = parser.parse_args()
+
+    return args
+
+
+def collect_clip_files(inputs):
+    # 入力(ファイル、ディレクトリ、globパターン)から .clip ファイルを収集
+    # ※戻り値：(.clipファイルパス, 出力用相対パス) のリスト
+    clip_file_list = []
+    for input_path in inputs:
+        if os.path.isdir(input_path):
+            pattern = os.path.join(input_path, '**', '*.clip')
+            for filepath in sorted(glob.glob(pattern, recursive=True)):
+                relative_path = os.path.relpath(filepath, input_path)
+                clip_file_list.append((filepath, relative_path))
+        else:
+            # ※globパターンはワイルドカードを含まない親ディレクトリからの
+            #   相対パスを使用(dir1/a.clip と dir2/a.clip の出力先を区別)
+            base_directory = get_glob_base_directory(input_path)
+            for filepath in sorted(glob.glob(input_path, recursive=True)):
+                if os.path.splitext(filepath)[1] != '.clip':
+                    continue
+                relative_path = os.path.relpath(filepath, base_directory)
+                clip_file_list.append((filepath, relative_path))
+
+    # 重複除去
+    unique_clip_file_list = []
+    filepath_set = set()
+    for filepath, relative_path in clip_file_list:
+        absolute_path = os.path.abspath(filepath)
+        if absolute_path in filepath_set:
+            continue
+        filepath_set.add(absolute_path)
+        unique_clip_file_list.append((filepath, relative_path))
+
+    return unique_clip_file_list
+
+
+def get_glob_base_directory(pattern):
+    # globパターンのうち、ワイルドカードを含まない親ディレクトリ
+    base_directory = os.path.dirname(pattern)
+    while glob.has_magic(base_directory):
+        base_directory = os.path.dirname(base_directory)
+
+    return base_directory if base_directory != '' else os.curdir
+
+
+def get_output_directory(output_root, relative_path):
+    return os.path.join(output_root, os.path.splitext(relative_path)[0])
+
+
+def is_up_to_date(filepath, output_directory, export_raster=True):
+    # 変換完了マーカーが入力ファイルより新しく、要求した出力を含んでいれば
+    # 変換済みとみなす
+    # ※マーカーは全出力の最後に書き込むため、途中で中断した出力は再変換される
+    # ※レイヤー画像なしで出力済みの場合、レイヤー画像を要求すると再変換する
+    marker_path = os.path.join(output_directory, MARKER_FILENAME)
+    if not os.path.exists(marker_path):
+        return False
+    if os.path.getmtime(marker_path) < os.path.getmtime(filepath):
+        return False
+
+    try:
+        with open(marker_path, mode='r', encoding='utf-8') as f:
+            marker_data = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if not isinstance(marker_data, dict):
+        return False
+
+    return bool(marker_data.get('export_raster')) or not export_raster
+
+
+def convert_clip_file(filepath, output_directory, export_raster=True):
+    phase_time = {phase: 0.0 for phase in PHASE_LIST}
+    layer_count = 0
+
+    os.makedirs(output_directory, exist_ok=True)
+
+    # ファイルオープン
+    start_time = time.perf_counter()
+    csp_tool = CspTool(
+        filepath,
+        decode_workers=1,
+        use_mmap=True,
+        lazy_load=not export_raster,
+    )
+    phase_time['open'] += time.perf_counter() - start_time
+
+    with csp_tool:
+        # サムネイル画像
+        start_time = time.perf_counter()
+        thumbnail_image = csp_tool.get_thumbnail_image()
+        phase_time['thumbnail'] += time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        cv2.imwrite(
+            os.path.join(output_directory, 'thumbnail.png'),
+            thumbnail_image,
+        )
+        phase_time['write'] += time.perf_counter() - start_time
+
+        # レイヤー情報
+        start_time = time.perf_counter()
+        layer_list = csp_tool.get_layer_list()
+        phase_time['metadata'] += time.perf_counter() - start_time
+
+        # ラスターデータ
+        if export_raster:
+            for layer_data in layer_list:
+                canvas_id = layer_data['canvas_id']
+                layer_id = layer_data['main_id']
+
+                start_time = time.perf_counter()
+                _, _, bgra_image = csp_tool.get_raster_data(
+                    canvas_id,
+                    layer_id,
+                )
+                phase_time['raster'] += time.perf_counter() - start_time
+
+                if bgra_image is None:
+                    continue
+
+                start_time = time.perf_counter()
+                cv2.imwrite(
+                    os.path.join(
+                        output_directory,
+                        'layer_{}_{}.png'.format(canvas_id, layer_id),
+                    ),
+                    bgra_image,
+                )
+                phase_time['write'] += time.perf_counter() - start_time
+                layer_count += 1
+
+        # レイヤー情報JSON
+        start_time = time.perf_counter()
+        with open(
+                os.path.join(output_directory, 'layers.json'),
+                mode='w',
+                encoding='utf-8',
+        ) as f:
+            json.dump(layer_list, f, ensure_ascii=False, indent=4)
+
+        # 変換完了マーカー(出力モードを記録)
+        with open(
+                os.path.join(output_directory, MARKER_FILENAME),
+                mode='w',
+                encoding='utf-8',
+        ) as f:
+            json.dump({'export_raster': export_raster}, f, indent=4)
+        phase_time['write'] += time.perf_counter() - start_time
+
+    result = {
+        'filepath': filepath,
+        'file_size': os.path.getsize(filepath),
+        'layer_count': layer_count,
+        'phase_time': phase_time,
+    }
+
+    return result
+
+
+def main():
+    args = get_args()
+
+    workers = args.workers
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # 変換対象のファイルを収集(出力が最新のファイルはスキップ)
+    job_list = []
+    skip_count = 0
+    for filepath, relative_path in collect_clip_files(args.inputs):
+        output_directory = get_output_directory(args.output, relative_path)
+        if not args.force and is_up_to_date(
+                filepath,
+                output_directory,
+                not args.no_raster,
+        ):
+            skip_count += 1
+            continue
+        job_list.append((filepath, output_directory, not args.no_raster))
+
+    print('Convert: {} files (skip: {} files)'.format(
+        len(job_list),
+        skip_count,
+    ))
+
+    # 変換
+    start_time = time.perf_counter()
+    total_phase_time = {phase: 0.0 for phase in PHASE_LIST}
+    total_file_size = 0
+    total_layer_count = 0
+    error_count = 0
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        future_dict = {
+            executor.submit(convert_clip_file, *job): job
+            for job in job_list
+        }
+        for future in as_completed(future_dict):
+            filepath = future_dict[future][0]
+            try:
+                result = future.result()
+            except Exception as exception:
+                error_count += 1
+                print('Error: {} ({})'.format(filepath, exception))
+                continue
+
+            total_file_size += result['file_size']
+            total_layer_count += result['layer_count']
+            for phase in PHASE_LIST:
+                total_phase_time[phase] += result['phase_time'][phase]
+            print('Done: {} ({} layers)'.format(
+                filepath,
+                result['layer_count'],
+            ))
+    elapsed_time = time.perf_counter() - start_time
+
+    # 処理統計
+    file_count = len(job_list) - error_count
+    print('Files     : {} (error: {})'.format(file_count, error_count))
+    print('Layers    : {}'.format(total_layer_count))
+    print('Elapsed   : {:.2f}s'.format(elapsed_time))
+    if elapsed_time > 0:
+        print('Throughput: {:.2f} files/s, {:.2f} MB/s'.format(
+            file_count / elapsed_time,
+            total_file_size / (1024 * 1024) / elapsed_time,
+        ))
+    print('Phase time (total of all workers):')
+    for phase in PHASE_LIST:
+        print('    {:<10}: {:.2f}s'.format(phase, total_phase_time[phase]))
+
+    return 1 if error_count > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
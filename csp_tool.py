@@ -1,18 +1,554 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import os
+import math
 import zlib
-import copy
+import mmap
 import time
 import struct
 import sqlite3
+import hashlib
 import logging
+import tempfile
+import threading
+from types import MappingProxyType
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import as_completed
 
 import cv2
 import numpy as np
 
+try:
+    import tifffile
+except ImportError:
+    tifffile = None
+
+
+class _DecodedLayerCache(object):
+    # デコード済みレイヤー画像のLRUキャッシュ(バイトサイズ上限付き)
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self.hit_count = 0
+        self.miss_count = 0
+        self.eviction_count = 0
+        self._entry_dict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entry_dict.get(key)
+            if entry is None:
+                self.miss_count += 1
+                return None
+
+            self._entry_dict.move_to_end(key)
+            self.hit_count += 1
+
+        return entry[0]
+
+    def put(self, key, value):
+        # ※登録する画像は呼び出し元で読み取り専用にしておくこと
+        value_size = self._get_value_size(value)
+        if value_size > self.max_size:
+            return
+
+        with self._lock:
+            if key in self._entry_dict:
+                self.size -= self._entry_dict.pop(key)[1]
+            self._entry_dict[key] = (value, value_size)
+            self.size += value_size
+
+            # 上限を超えた場合、最も古いエントリから削除
+            while self.size > self.max_size:
+                _, (_, evicted_size) = self._entry_dict.popitem(last=False)
+                self.size -= evicted_size
+                self.eviction_count += 1
+
+    def clear(self):
+        with self._lock:
+            self._entry_dict.clear()
+            self.size = 0
+
+    def get_info(self):
+        with self._lock:
+            cache_info = {
+                'hit_count': self.hit_count,
+                'miss_count': self.miss_count,
+                'eviction_count': self.eviction_count,
+                'entry_count': len(self._entry_dict),
+                'size': self.size,
+                'max_size': self.max_size,
+            }
+
+        return cache_info
+
+    def _get_value_size(self, value):
+        # ビューは元配列を1回だけ計上する
+        base_array_dict = {}
+        for image in value:
+            if image is None:
+                continue
+            while isinstance(image.base, np.ndarray):
+                image = image.base
+            base_array_dict[id(image)] = image.nbytes
+
+        return sum(base_array_dict.values())
+
+
+class _TileDiskCache(object):
+    # 解凍済みブロックデータのディスクキャッシュ(プロセス間共有)
+    # ※キーは圧縮ブロックデータのハッシュ値、値は解凍済みバイト列をそのまま保存
+    # ※書き込みは一時ファイル経由のリネームで行うため、
+    #   複数プロセスから同時に読み書きしても不完全なデータは読み出されない
+
+    def __init__(self, cache_dir, max_size):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hit_count = 0
+        self.miss_count = 0
+        self.eviction_count = 0
+        self._written_size = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get_key(self, block_zlib_data, block_uncompressed_size):
+        hash_data = hashlib.blake2b(block_zlib_data, digest_size=20)
+        return hash_data.hexdigest() + '_' + str(block_uncompressed_size)
+
+    def read_into(self, key, output_view, output_offset, size):
+        # キャッシュをメモリマップし、出力バッファの該当位置へ書き込み
+        filepath = self._get_filepath(key)
+        try:
+            with open(filepath, mode='rb') as cache_file:
+                if os.fstat(cache_file.fileno()).st_size != size:
+                    raise FileNotFoundError(filepath)
+                with mmap.mmap(cache_file.fileno(), 0,
+                               access=mmap.ACCESS_READ) as cache_mmap:
+                    cache_view = memoryview(cache_mmap)
+                    output_view[output_offset:output_offset + size] = \
+                        cache_view
+                    cache_view.release()
+
+            # 参照時刻を更新(削除順の判定に使用)
+            os.utime(filepath)
+        except (OSError, ValueError):
+            with self._lock:
+                self.miss_count += 1
+            return False
+
+        with self._lock:
+            self.hit_count += 1
+
+        return True
+
+    def write(self, key, block_data):
+        filepath = self._get_filepath(key)
+        temp_filepath = '{}.{}.{}.tmp'.format(
+            filepath,
+            os.getpid(),
+            threading.get_ident(),
+        )
+        try:
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            with open(temp_filepath, mode='wb') as cache_file:
+                cache_file.write(block_data)
+            os.replace(temp_filepath, filepath)
+        except OSError:
+            if os.path.exists(temp_filepath):
+                os.remove(temp_filepath)
+            return
+
+        # 書き込み量が上限の1割を超えるごとに容量を確認
+        with self._lock:
+            self._written_size += len(block_data)
+            if self._written_size < self.max_size // 10:
+                return
+            self._written_size = 0
+        self.evict()
+
+    def evict(self):
+        # 上限を超えている場合、参照時刻が古いものから削除
+        cache_file_list = []
+        total_size = 0
+        for directory_entry in os.scandir(self.cache_dir):
+            if not directory_entry.is_dir():
+                continue
+            for file_entry in os.scandir(directory_entry.path):
+                if not file_entry.name.endswith('.tile'):
+                    continue
+                try:
+                    stat_result = file_entry.stat()
+                except OSError:
+                    continue
+                cache_file_list.append((
+                    stat_result.st_mtime,
+                    stat_result.st_size,
+                    file_entry.path,
+                ))
+                total_size += stat_result.st_size
+
+        cache_file_list.sort()
+        for _, file_size, filepath in cache_file_list:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(filepath)
+            except OSError:
+                continue
+            total_size -= file_size
+            with self._lock:
+                self.eviction_count += 1
+
+    def get_info(self):
+        with self._lock:
+            cache_info = {
+                'cache_dir': self.cache_dir,
+                'hit_count': self.hit_count,
+                'miss_count': self.miss_count,
+                'eviction_count': self.eviction_count,
+                'max_size': self.max_size,
+            }
+
+        return cache_info
+
+    def _get_filepath(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.tile')
+
+
+class _Metrics(object):
+    # 処理フェーズ毎の時間(秒)と各種カウンターの集計
+    # ※コールバック指定時は、記録毎に callback(メトリクス名, 値) を呼び出す
+
+    PHASE_LIST = [
+        'file_read',
+        'sqlite_load',
+        'chunk_scan',
+        'disk_cache_read',
+        'inflate',
+        'assemble',
+    ]
+    COUNTER_LIST = [
+        'bytes_read',
+        'compressed_bytes',
+        'inflated_bytes',
+        'tiles_decoded',
+        'tiles_skipped',
+        'layer_cache_hits',
+        'layer_cache_misses',
+        'disk_cache_hits',
+        'disk_cache_misses',
+    ]
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._lock = threading.Lock()
+        self.reset()
+
+    def add_time(self, phase, elapsed_time):
+        self.add(phase + '_time', elapsed_time)
+
+    def add(self, name, value):
+        with self._lock:
+            self._stats[name] += value
+        if self.callback is not None:
+            self.callback(name, value)
+
+    def reset(self):
+        stats = {phase + '_time': 0.0 for phase in self.PHASE_LIST}
+        stats.update({counter: 0 for counter in self.COUNTER_LIST})
+        with self._lock:
+            self._stats = stats
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+class LayerArray(object):
+    # レイヤー画像(BGRA)の配列ライクなビュー
+    # ※スライス時に該当範囲のブロックのみ解凍し、解凍済みブロックは保持する
+
+    def __init__(self, csp_tool, external_id, image_width, image_height):
+        self.shape = (image_height, image_width, 4)
+        self.dtype = np.dtype(np.uint8)
+        self.ndim = 3
+
+        self._csp_tool = csp_tool
+        self._chunk_data = csp_tool.chunk_external_dict.get(external_id)
+        _, self._blocks_per_column = csp_tool._get_block_grid(
+            image_width,
+            image_height,
+        )
+        self._block_info_dict = None
+        self._tile_dict = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        bgra_image = self[:, :]
+        if dtype is not None:
+            bgra_image = bgra_image.astype(dtype, copy=False)
+
+        return bgra_image
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key, )
+
+        # 先頭2次元(y, x)がスライスまたは整数の場合のみ範囲を限定して解凍
+        # ※それ以外のインデックスは画像全体を構築してから適用
+        if len(key) < 2:
+            key = key + (slice(None), ) * (2 - len(key))
+        if not all(isinstance(value, (slice, int, np.integer))
+                   for value in key[:2]):
+            return self._get_region(0, 0, self.shape[1],
+                                    self.shape[0])[key]
+
+        range_y = self._get_index_range(key[0], self.shape[0])
+        range_x = self._get_index_range(key[1], self.shape[1])
+        region = self._get_region(
+            range_x[0],
+            range_y[0],
+            range_x[1],
+            range_y[1],
+        )
+
+        # 取得範囲を基準にインデックスを補正
+        region_key = (
+            self._shift_index(key[0], range_y[0], self.shape[0]),
+            self._shift_index(key[1], range_x[0], self.shape[1]),
+        ) + key[2:]
+
+        return region[region_key]
+
+    def _get_index_range(self, index, size):
+        # インデックスが参照する範囲 [start, stop) を算出
+        if isinstance(index, slice):
+            start, stop, step = index.indices(size)
+            if step < 0:
+                start, stop = stop + 1, start + 1
+            return start, max(start, stop)
+
+        index = int(index)
+        if index < 0:
+            index += size
+        if index < 0 or index >= size:
+            raise IndexError('index ' + str(index) +
+                             ' is out of bounds for size ' + str(size))
+
+        return index, index + 1
+
+    def _shift_index(self, index, offset, size):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(size)
+            start -= offset
+            stop -= offset
+            if stop < 0:
+                stop = None
+            return slice(start, stop, step)
+
+        index = int(index)
+        if index < 0:
+            index += size
+
+        return index - offset
+
+    def _get_region(self, x0, y0, x1, y1):
+        # 指定範囲の画像を構築(必要なブロックのみ解凍)
+        region = np.zeros((y1 - y0, x1 - x0, 4), dtype=np.uint8)
+        if x1 <= x0 or y1 <= y0:
+            return region
+
+        block_index_list = [
+            block_y * self._blocks_per_column + block_x
+            for block_y in range(y0 // 256, (y1 + 255) // 256)
+            for block_x in range(x0 // 256, (x1 + 255) // 256)
+        ]
+        self._decode_tile(block_index_list)
+
+        for block_index in block_index_list:
+            tile = self._tile_dict.get(block_index)
+            if tile is None:
+                continue
+
+            tile_x = (block_index % self._blocks_per_column) * 256
+            tile_y = (block_index // self._blocks_per_column) * 256
+            region_x0, region_y0 = max(x0, tile_x), max(y0, tile_y)
+            region_x1 = min(x1, tile_x + 256)
+            region_y1 = min(y1, tile_y + 256)
+            region[region_y0 - y0:region_y1 - y0,
+                   region_x0 - x0:region_x1 - x0] = tile[
+                       region_y0 - tile_y:region_y1 - tile_y,
+                       region_x0 - tile_x:region_x1 - tile_x]
+
+        return region
+
+    def _decode_tile(self, block_index_list):
+        if self._chunk_data is None:
+            return
+
+        # 複数スレッドからのスライスで同じブロックを重複して解凍しないよう排他
+        with self._lock:
+            self._decode_tile_unlocked(block_index_list)
+
+    def _decode_tile_unlocked(self, block_index_list):
+        binary_data = self._csp_tool._get_binary_data()
+
+        # ブロック情報(初回のみブロックヘッダーを走査して取得)
+        if self._block_info_dict is None:
+            self._block_info_dict = {
+                block_info['block_index']: block_info
+                for block_info in self._csp_tool._get_block_info_list(
+                    self._chunk_data, binary_data)
+            }
+
+        # 未解凍かつ存在するブロックのみ解凍
+        decode_index_list = []
+        for block_index in block_index_list:
+            block_info = self._block_info_dict.get(block_index)
+            if block_index in self._tile_dict or block_info is None:
+                continue
+            if block_info['exist']:
+                decode_index_list.append(block_index)
+        if len(decode_index_list) == 0:
+            return
+
+        # 保持済みのブロック情報から解凍(ブロックヘッダーの再走査は行わない)
+        external_data = self._csp_tool._decompress_block_list(
+            binary_data,
+            [
+                self._block_info_dict[block_index]
+                for block_index in decode_index_list
+            ],
+        )
+        if len(external_data) != len(
+                decode_index_list) * CspTool._BGR_COMPOSITE_BLOCK_SIZE:
+            self._csp_tool.logger.error('LayerArray._decode_tile()')
+            self._csp_tool.logger.error('    bgr_expected_size:Mismatch Size')
+            return
+
+        # ブロック単位のBGRA画像に変換して保持(4チャンネル目はアルファ画像)
+        block_data = np.frombuffer(external_data, dtype=np.uint8).reshape(
+            len(decode_index_list), CspTool._BGR_COMPOSITE_BLOCK_SIZE)
+        for index, block_index in enumerate(decode_index_list):
+            block = block_data[index]
+            tile = block[CspTool._BLOCK_SIZE:].reshape(256, 256, 4).copy()
+            tile[:, :, 3] = block[:CspTool._BLOCK_SIZE].reshape(256, 256)
+            self._tile_dict[block_index] = tile
+
 
 class CspTool(object):
+    # スレッドセーフティ
+    # ※オープン後のメタデータ(レイヤー情報等)とインデックスは変更されないため、
+    #   1つのインスタンスを複数スレッドで共有し、get_raster_data()、
+    #   get_thumbnail_image()等の取得系メソッドを同時に呼び出すことが可能
+    # ※取得したレイヤー情報(辞書)は共有データのため、呼び出し元で変更しないこと
+    # ※close()は他スレッドの処理が全て完了してから呼び出すこと
+    # ※SQLiteの各テーブルは初回アクセス時に読み出す(読み出しはロックで排他)
+
+    # SQLiteテーブル毎の読み出し列(列名, 辞書のキー)
+    _SQLITE_TABLE_DICT = {
+        'CanvasPreview': [
+            ('MainId', 'main_id'),
+            ('CanvasId', 'canvas_id'),
+            ('ImageData', 'image_data'),
+            ('ImageWidth', 'image_width'),
+            ('ImageHeight', 'image_height'),
+        ],
+        'Layer': [
+            ('MainId', 'main_id'),
+            ('CanvasId', 'canvas_id'),
+            ('LayerName', 'layer_name'),
+            ('LayerUuid', 'layer_uuid'),
+            ('LayerRenderMipmap', 'layer_render_mipmap'),
+            ('LayerRenderThumbnail', 'layer_render_thumbnail'),
+            ('LayerNextIndex', 'layer_next_index'),
+            ('LayerFirstChildIndex', 'layer_first_child_index'),
+            ('LayerType', 'layer_type'),
+            ('LayerVisibility', 'layer_visibility'),
+            ('LayerOpacity', 'layer_opacity'),
+            ('LayerComposite', 'layer_composite'),
+            ('LayerClip', 'layer_clip'),
+            ('LayerLayerMaskMipmap', 'layer_layer_mask_mipmap'),
+        ],
+        'LayerThumbnail': [
+            ('MainId', 'main_id'),
+            ('CanvasId', 'canvas_id'),
+            ('LayerId', 'layer_id'),
+            ('ThumbnailCanvasWidth', 'thumbnail_canvas_width'),
+            ('ThumbnailCanvasHeight', 'thumbnail_canvas_height'),
+            ('ThumbnailOffscreen', 'thumbnail_offscreen'),
+        ],
+        'Offscreen': [
+            ('MainId', 'main_id'),
+            ('CanvasId', 'canvas_id'),
+            ('LayerId', 'layer_id'),
+            ('CAST(BlockData AS TEXT)', 'block_data'),
+        ],
+        'Mipmap': [
+            ('MainId', 'main_id'),
+            ('CanvasId', 'canvas_id'),
+            ('LayerId', 'layer_id'),
+            ('MipmapCount', 'mipmap_count'),
+            ('BaseMipmapInfo', 'base_mipmap_info'),
+        ],
+        'MipmapInfo': [
+            ('MainId', 'main_id'),
+            ('CanvasId', 'canvas_id'),
+            ('LayerId', 'layer_id'),
+            ('ThisScale', 'this_scale'),
+            ('Offscreen', 'offscreen'),
+            ('NextIndex', 'next_index'),
+        ],
+    }
+
+    # テーブル単位のインデックス名 → (テーブル名, キーの列名, キーの辞書のキー)
+    _SQLITE_INDEX_DICT = {
+        'layer': ('Layer', ['CanvasId', 'MainId'], ['canvas_id', 'main_id']),
+        'layer_thumbnail': (
+            'LayerThumbnail',
+            ['CanvasId', 'MainId'],
+            ['canvas_id', 'main_id'],
+        ),
+        'offscreen': ('Offscreen', ['MainId'], ['main_id']),
+        'mipmap': ('Mipmap', ['MainId'], ['main_id']),
+        'mipmap_info': ('MipmapInfo', ['MainId'], ['main_id']),
+    }
+
+    # ブロック(タイル)構成
+    # ※1ブロックは 256×256 のアルファ画像(block_size)と、
+    #   256×256 のBGRA画像(4チャンネル目は未使用)の連結
+    _TILE_SIZE = 256
+    _PIXEL_SIZE = 4
+    _BLOCK_SIZE = 256 * 256
+    _BGR_COMPOSITE_BLOCK_SIZE = 256 * 320 * _PIXEL_SIZE
+
+    # 初回アクセス時に作成する属性 → インデックス名
+    _LAZY_INDEX_DICT = {
+        'canvas_preview_list': 'canvas_preview',
+        'layer_list': 'layer',
+        'layer_dict': 'layer',
+        'layer_uuid_dict': 'layer',
+        'layer_name_dict': 'layer',
+        'layer_tree_dict': 'layer',
+        'layer_order_dict': 'layer',
+        'layer_thumbnail_list': 'layer_thumbnail',
+        'layer_thumbnail_dict': 'layer_thumbnail',
+        'offscreen_list': 'offscreen',
+        'offscreen_dict': 'offscreen',
+        'mipmap_list': 'mipmap',
+        'mipmap_dict': 'mipmap',
+        'mipmap_info_list': 'mipmap_info',
+        'mipmap_info_dict': 'mipmap_info',
+        'external_id_dict': 'external_id',
+        'mipmap_chain_dict': 'external_id',
+    }
 
     def __init__(
             self,
@@ -20,16 +556,29 @@ class CspTool(object):
             logger_name='Clip-Studio-File-Tool',
             log_filename=None,
             debug_level='WARNING',  # 'DEBUG', 'INFO', 'ERROR', 'CRITICAL'
+            decode_workers=None,  # ブロック解凍スレッド数(None:CPU数)
+            use_mmap=False,  # True:ファイルをメモリマップして読み出す
+            lazy_load=False,  # True:External Dataを初回アクセス時に読み出す
+            cache_size=0,  # デコード済みレイヤーキャッシュ上限(バイト、0:無効)
+            disk_cache_dir=None,  # 解凍済みブロックのディスクキャッシュ先(None:無効)
+            disk_cache_size=1024 * 1024 * 1024,  # ディスクキャッシュ上限(バイト)
+            metrics=False,  # True:処理時間、バイト数等を集計(stats()で取得)
+            metrics_callback=None,  # 集計時に呼び出す関数(名前, 値)
     ):
-        # Logger設定
-        self.logger = logging.getLogger(logger_name)
-        self.set_debug_level(log_filename, debug_level)
-
-        # チャンクデータ保持用変数
-        self.chunk_header = None
-        self.chunk_external_list = []
-        self.chunk_sqldb = None
-        self.chunk_footer = None
+        self._init_instance(
+            filepath,
+            logger_name=logger_name,
+            log_filename=log_filename,
+            debug_level=debug_level,
+            decode_workers=decode_workers,
+            use_mmap=use_mmap,
+            lazy_load=lazy_load,
+            cache_size=cache_size,
+            disk_cache_dir=disk_cache_dir,
+            disk_cache_size=disk_cache_size,
+            metrics=metrics,
+            metrics_callback=metrics_callback,
+        )
 
         # 拡張子確認
         extension = os.path.splitext(filepath)[1]
@@ -43,67 +592,1193 @@ class CspTool(object):
         self.chunk_external_list = csf_info[0]
         self.binary_data = csf_info[1]
         self.sqlite_binary_data = csf_info[2]
-
-        # sqliteデータ読み出し
-        sqlite_data = self._read_sqlite_data(self.sqlite_binary_data)
-        self.canvas_preview_list = sqlite_data[0]
-        self.layer_list = sqlite_data[1]
-        self.layer_thumbnail_list = sqlite_data[2]
-        self.offscreen_list = sqlite_data[3]
-        self.mipmap_list = sqlite_data[4]
-        self.mipmap_info_list = sqlite_data[5]
+        self.chunk_external_dict = MappingProxyType(csf_info[3])
+
+        # sqlite接続(メモリ上に展開)
+        # ※各テーブルの読み出し、インデックス作成は初回アクセス時に行う
+        if self._metrics is not None:
+            start_time = time.perf_counter()
+        self._sqlite_connect = self._open_sqlite_connection(
+            self.sqlite_binary_data)
+        if self._metrics is not None:
+            self._metrics.add_time('sqlite_load',
+                                   time.perf_counter() - start_time)
 
         return
 
+    @classmethod
+    def _for_worker(
+        cls,
+        filepath,
+        chunk_external_dict,
+        logger_name='Clip-Studio-File-Tool',
+        disk_cache_dir=None,
+        disk_cache_size=1024 * 1024 * 1024,
+    ):
+        # プロセスプールのワーカー用インスタンスを生成
+        # ※SQLite読み出しを行わず、呼び出し元から受け取ったチャンク位置のみを持つ
+        # ※ファイルは初回アクセス時にメモリマップして読み出す
+        # ※ログレベルは変更しない(debug_level=None)
+        csp_tool = cls.__new__(cls)
+        csp_tool._init_instance(
+            filepath,
+            logger_name=logger_name,
+            log_filename=None,
+            debug_level=None,
+            decode_workers=1,
+            use_mmap=True,
+            lazy_load=True,
+            cache_size=0,
+            disk_cache_dir=disk_cache_dir,
+            disk_cache_size=disk_cache_size,
+            metrics=False,
+            metrics_callback=None,
+        )
+        csp_tool.chunk_external_dict = MappingProxyType(chunk_external_dict)
+
+        return csp_tool
+
+    def _init_instance(
+        self,
+        filepath,
+        logger_name,
+        log_filename,
+        debug_level,
+        decode_workers,
+        use_mmap,
+        lazy_load,
+        cache_size,
+        disk_cache_dir,
+        disk_cache_size,
+        metrics,
+        metrics_callback,
+    ):
+        # ファイル読み出し前の状態を初期化(__init__()、_for_worker()で共通)
+        # Logger設定
+        self.logger = logging.getLogger(logger_name)
+        self.set_debug_level(log_filename, debug_level)
+
+        # 遅延読み出し等の排他用ロック
+        self._lock = threading.Lock()
+
+        # SQLite接続と作成済みインデックス
+        # ※インデックス作成中に他のインデックスを参照するため再入可能なロックを使用
+        self._sqlite_lock = threading.RLock()
+        self._sqlite_connect = None
+        self._index_set = set()
+
+        # メトリクス集計(無効時はNone)
+        self._metrics = None
+        if metrics or metrics_callback is not None:
+            self._metrics = _Metrics(metrics_callback)
+
+        # ブロック解凍スレッド数
+        if decode_workers is None:
+            decode_workers = os.cpu_count() or 1
+        self.decode_workers = max(1, decode_workers)
+
+        # メモリマップ設定
+        self.use_mmap = use_mmap
+        self._mmap = None
+
+        # 遅延読み出し設定
+        # ※有効時はチャンクヘッダーとSQLiteチャンクのみ読み出し、
+        #   External Dataは初回のラスターデータ取得時にファイルから読み出す
+        self.lazy_load = lazy_load
+        self.filepath = filepath
+        self.binary_data = None
+
+        # close()済みフラグ(close()後のファイル、SQLiteへのアクセスは例外)
+        self._closed = False
+
+        # デコード済みレイヤーキャッシュ
+        self._layer_cache = None
+        if cache_size > 0:
+            self._layer_cache = _DecodedLayerCache(cache_size)
+
+        # 解凍済みブロックのディスクキャッシュ
+        self._tile_disk_cache = None
+        if disk_cache_dir is not None:
+            self._tile_disk_cache = _TileDiskCache(
+                disk_cache_dir,
+                disk_cache_size,
+            )
+
+        # チャンクデータ保持用変数
+        self.chunk_header = None
+        self.chunk_external_list = []
+        self.chunk_sqldb = None
+        self.chunk_footer = None
+
+    def __getattr__(self, name):
+        # SQLite由来のインデックス(layer_list、layer_dict等)を初回アクセス時に作成
+        # ※作成後は通常の属性として参照されるため、本メソッドは呼び出されない
+        # ※close()後はインデックス作成時にValueErrorを送出
+        index_name = CspTool._LAZY_INDEX_DICT.get(name)
+        if index_name is None or (
+                self.__dict__.get('_sqlite_connect') is None
+                and not self.__dict__.get('_closed', False)):
+            raise AttributeError("'{}' object has no attribute '{}'".format(
+                type(self).__name__, name))
+
+        self._create_index(index_name)
+
+        return self.__dict__[name]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        # ファイルデータ、メモリマップ、SQLite接続、デコード済みレイヤーを解放
+        # ※close()後にファイルやSQLiteへのアクセスが必要な処理を呼び出した場合は
+        #   ファイルを開き直さずにValueErrorを送出
+        if self._closed:
+            return
+        self._closed = True
+
+        for attribute_name in ['binary_data', 'sqlite_binary_data']:
+            binary_data = self.__dict__.get(attribute_name)
+            if isinstance(binary_data, memoryview):
+                binary_data.release()
+            setattr(self, attribute_name, None)
+
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+        if self._sqlite_connect is not None:
+            self._sqlite_connect.close()
+            self._sqlite_connect = None
+
+        if self._layer_cache is not None:
+            self._layer_cache.clear()
+
+    def _check_closed(self):
+        if self._closed:
+            raise ValueError('I/O operation on closed CspTool: ' +
+                             str(self.filepath))
+
     def get_layer_list(self):
         return self.layer_list
 
+    def get_layer_by_uuid(self, layer_uuid):
+        key = self.layer_uuid_dict.get(layer_uuid)
+        if key is None:
+            return None
+
+        return self.layer_dict[key]
+
+    def get_layers_by_name(self, layer_name, canvas_id=None):
+        return [
+            self.layer_dict[key]
+            for key in self.layer_name_dict.get(layer_name, [])
+            if canvas_id is None or key[0] == canvas_id
+        ]
+
+    def get_layer_parent(self, canvas_id, layer_id):
+        layer_tree_data = self.layer_tree_dict.get((canvas_id, layer_id))
+        if layer_tree_data is None or layer_tree_data['parent_id'] is None:
+            return None
+
+        return self.layer_dict[(canvas_id, layer_tree_data['parent_id'])]
+
+    def get_layer_children(self, canvas_id, layer_id):
+        # 子レイヤー一覧(下層から上層の順)
+        layer_tree_data = self.layer_tree_dict.get((canvas_id, layer_id))
+        if layer_tree_data is None:
+            return []
+
+        return [
+            self.layer_dict[(canvas_id, child_id)]
+            for child_id in layer_tree_data['children_id_list']
+        ]
+
+    def get_layer_siblings(self, canvas_id, layer_id):
+        # 直前(下層)、直後(上層)の兄弟レイヤー
+        layer_tree_data = self.layer_tree_dict.get((canvas_id, layer_id))
+        if layer_tree_data is None:
+            return None, None
+
+        previous_layer_data, next_layer_data = None, None
+        if layer_tree_data['previous_id'] is not None:
+            previous_layer_data = self.layer_dict[(
+                canvas_id, layer_tree_data['previous_id'])]
+        if layer_tree_data['next_id'] is not None:
+            next_layer_data = self.layer_dict[(canvas_id,
+                                               layer_tree_data['next_id'])]
+
+        return previous_layer_data, next_layer_data
+
+    def get_layer_subtree(
+        self,
+        canvas_id,
+        layer_id,
+        layer_type=None,
+        include_self=False,
+    ):
+        # 配下の全レイヤー(下層から上層の順)
+        # ※layer_type：指定した場合、該当するLayerTypeのレイヤーのみ返す
+        layer_tree_data = self.layer_tree_dict.get((canvas_id, layer_id))
+        if layer_tree_data is None:
+            return []
+
+        start_index = layer_tree_data['order_index']
+        if not include_self:
+            start_index += 1
+        layer_order = self.layer_order_dict[canvas_id]
+        layer_data_list = [
+            self.layer_dict[(canvas_id, subtree_layer_id)] for
+            subtree_layer_id in layer_order[start_index:layer_tree_data[
+                'subtree_end']]
+        ]
+        if layer_type is not None:
+            layer_data_list = [
+                layer_data for layer_data in layer_data_list
+                if layer_data['layer_type'] == layer_type
+            ]
+
+        return layer_data_list
+
+    def iter_layer_tree(self, canvas_id):
+        # (深さ, レイヤー情報) を下層から上層の順(ツリーの行きがけ順)に返す
+        for layer_id in self.layer_order_dict.get(canvas_id, []):
+            yield (
+                self.layer_tree_dict[(canvas_id, layer_id)]['depth'],
+                self.layer_dict[(canvas_id, layer_id)],
+            )
+
     def get_thumbnail_image(self):
-        thumbnail_image = self.canvas_preview_list[0]['image_data']
+        # CanvasPreview未読み出しの場合は先頭の1件のみ読み出す
+        if 'canvas_preview' in self._index_set:
+            canvas_preview_list = self.canvas_preview_list
+        else:
+            canvas_preview_list = self._read_sqlite_table(
+                'CanvasPreview',
+                limit=1,
+            )
+        thumbnail_image = canvas_preview_list[0]['image_data']
         thumbnail_image = cv2.imdecode(
             np.frombuffer(thumbnail_image, np.uint8),
             flags=cv2.IMREAD_COLOR,
         )
         return thumbnail_image
 
-    def get_raster_data(self, canvas_id, layer_id):
+    def get_external_data_info_list(self):
+        # 各External Dataのサイズ情報を取得(ブロックの解凍は行わない)
+        external_data_info_list = []
+        for external_id, chunk_data in self.chunk_external_dict.items():
+            block_info_list = self._get_block_info_list(
+                chunk_data,
+                self._get_binary_data(),
+            )
+
+            exist_block_count = 0
+            compressed_size = 0
+            uncompressed_size = 0
+            for block_info in block_info_list:
+                if block_info['exist']:
+                    exist_block_count += 1
+                    compressed_size += block_info['compressed_size']
+                uncompressed_size += block_info['uncompressed_size']
+
+            external_data_info = {
+                'external_id': external_id,
+                'chunk_size': chunk_data['size'],
+                'block_count': len(block_info_list),
+                'exist_block_count': exist_block_count,
+                'compressed_size': compressed_size,
+                'uncompressed_size': uncompressed_size,
+            }
+            external_data_info_list.append(external_data_info)
+
+        return external_data_info_list
+
+    def stats(self):
+        # メトリクス集計結果(処理フェーズ毎の時間(秒)、各種カウンター)
+        if self._metrics is None:
+            return None
+
+        return self._metrics.get_stats()
+
+    def reset_stats(self):
+        if self._metrics is not None:
+            self._metrics.reset()
+
+    def get_cache_info(self):
+        # デコード済みレイヤーキャッシュの統計(ヒット、ミス、削除数など)
+        if self._layer_cache is None:
+            return None
+
+        return self._layer_cache.get_info()
+
+    def get_disk_cache_info(self):
+        # 解凍済みブロックのディスクキャッシュの統計
+        if self._tile_disk_cache is None:
+            return None
+
+        return self._tile_disk_cache.get_info()
+
+    def clear_cache(self):
+        if self._layer_cache is not None:
+            self._layer_cache.clear()
+
+    def get_mipmap_level_list(self, canvas_id, layer_id):
+        # 該当レイヤーのミップマップ段階一覧を取得(等倍から縮小方向の順)
+        layer_thumbnail_data = self._get_layer_thumbnail(canvas_id, layer_id)
+        if layer_thumbnail_data is None:
+            return []
+        image_width = layer_thumbnail_data['thumbnail_canvas_width']
+        image_height = layer_thumbnail_data['thumbnail_canvas_height']
+
+        mipmap_level_list = []
+        mipmap_chain = self._get_mipmap_chain(canvas_id, layer_id)
+        for mipmap_detail_data in mipmap_chain or []:
+            this_scale = mipmap_detail_data['this_scale']
+            offscreen_data = self._get_sqlite_record(
+                'offscreen',
+                mipmap_detail_data['offscreen'],
+            )
+            external_id = None
+            if offscreen_data is not None:
+                external_id = offscreen_data['block_data']
+
+            mipmap_level_data = {
+                'scale': this_scale,
+                'width': int(math.ceil(image_width * this_scale / 100)),
+                'height': int(math.ceil(image_height * this_scale / 100)),
+                'external_id': external_id,
+                'exist': external_id in self.chunk_external_dict,
+            }
+            mipmap_level_list.append(mipmap_level_data)
+
+        return mipmap_level_list
+
+    def get_raster_data(self, canvas_id, layer_id, roi=None, scale=None):
+        # roi：(x, y, w, h) を指定した場合、該当範囲のブロックのみ解凍する
+        # scale：縮小率(%、MipmapInfoのThisScaleと同単位)を指定した場合、
+        #        該当するミップマップ段階のデータを解凍する
+        # ※キャッシュ有効時は、キャッシュから返すか否かによらず全ての画像を
+        #   読み取り専用で返す
         start_time = time.time()
 
-        # 該当のExternal IDを取得
-        external_id = self._get_external_id(canvas_id, layer_id)
+        # キャッシュ確認
+        cache_key = None
+        if self._layer_cache is not None:
+            external_id = self._get_external_id(canvas_id, layer_id)
+            if roi is not None:
+                roi = tuple(int(value) for value in roi)
+            cache_key = (external_id, roi, scale)
+            image_data = self._layer_cache.get(cache_key)
+            if self._metrics is not None:
+                if image_data is not None:
+                    self._metrics.add('layer_cache_hits', 1)
+                else:
+                    self._metrics.add('layer_cache_misses', 1)
+            if image_data is not None:
+                return image_data
 
         bgr_image, alpha_image, bgra_image = None, None, None
-        if external_id is not None:
-            # 該当のLayerThumbnailを取得
+        if scale is not None:
+            # ミップマップからラスターデータを取得
+            image_data = self._get_mipmap_raster_data(
+                canvas_id,
+                layer_id,
+                roi,
+                scale,
+            )
+            bgr_image, alpha_image, bgra_image = image_data
+        else:
+            # 該当のExternal IDを取得
+            external_id = self._get_external_id(canvas_id, layer_id)
+
+            if external_id is not None:
+                # 該当のLayerThumbnailを取得
+                layer_thumbnail_data = self._get_layer_thumbnail(
+                    canvas_id,
+                    layer_id,
+                )
+
+                image_data = self._get_raster_data_from_external_id(
+                    external_id,
+                    layer_thumbnail_data['thumbnail_canvas_width'],
+                    layer_thumbnail_data['thumbnail_canvas_height'],
+                    roi,
+                )
+                bgr_image, alpha_image, bgra_image = image_data
+
+        # キャッシュ登録
+        # ※キャッシュ内容が呼び出し元で書き換えられないよう読み取り専用にする
+        #   (キャッシュ有効時の戻り値を一貫させるため、上限超過時も同様)
+        if cache_key is not None and bgra_image is not None:
+            for image in (bgr_image, alpha_image, bgra_image):
+                if image is not None:
+                    image.setflags(write=False)
+            self._layer_cache.put(
+                cache_key,
+                (bgr_image, alpha_image, bgra_image),
+            )
+
+        elapsed_time = (time.time() - start_time) * 1000
+        self.logger.debug('get_raster_data():%.2fms', elapsed_time)
+
+        return bgr_image, alpha_image, bgra_image
+
+    def get_sparse_raster_data(self, canvas_id, layer_id):
+        # 存在するブロックのみを解凍し、ブロック単位の画像とバウンディングボックスを取得
+        # ※透明部分が多いレイヤーでは、メモリ使用量・処理時間が描画範囲に比例する
+        start_time = time.time()
+
+        sparse_raster_data = None
+
+        # 該当のExternal IDとLayerThumbnailを取得
+        external_id = self._get_external_id(canvas_id, layer_id)
+        layer_thumbnail_data = self._get_layer_thumbnail(canvas_id, layer_id)
+        if external_id is None or layer_thumbnail_data is None:
+            return sparse_raster_data
+        image_width = layer_thumbnail_data['thumbnail_canvas_width']
+        image_height = layer_thumbnail_data['thumbnail_canvas_height']
+
+        # 存在するブロックを取得
+        tile_list = self._get_sparse_tile_list(
+            external_id,
+            image_width,
+            image_height,
+        )
+        if tile_list is None:
+            return sparse_raster_data
+
+        sparse_raster_data = {
+            'image_width': image_width,
+            'image_height': image_height,
+            'tile_list': tile_list,
+            'bounding_box': self._get_tile_bounding_box(
+                tile_list,
+                image_width,
+                image_height,
+            ),
+        }
+
+        elapsed_time = (time.time() - start_time) * 1000
+        self.logger.debug('get_sparse_raster_data():%.2fms', elapsed_time)
+
+        return sparse_raster_data
+
+    def get_content_raster_data(self, canvas_id, layer_id):
+        # 描画内容が存在する範囲(バウンディングボックス)のみの画像を取得
+        bgr_image, alpha_image, bgra_image, bounding_box = (None, None, None,
+                                                            None)
+
+        sparse_raster_data = self.get_sparse_raster_data(canvas_id, layer_id)
+        if sparse_raster_data is None:
+            return bgr_image, alpha_image, bgra_image, bounding_box
+        bounding_box = sparse_raster_data['bounding_box']
+        if bounding_box is None:
+            return bgr_image, alpha_image, bgra_image, bounding_box
+
+        # バウンディングボックスの範囲にブロックを配置
+        x, y, w, h = bounding_box
+        bgra_image = np.zeros((h, w, 4), dtype=np.uint8)
+        for tile_data in sparse_raster_data['tile_list']:
+            tile_x = tile_data['block_x'] * 256
+            tile_y = tile_data['block_y'] * 256
+            x0, y0 = max(x, tile_x), max(y, tile_y)
+            x1, y1 = min(x + w, tile_x + 256), min(y + h, tile_y + 256)
+            if x1 <= x0 or y1 <= y0:
+                continue
+            bgra_image[y0 - y:y1 - y, x0 - x:x1 - x] = tile_data['bgra'][
+                y0 - tile_y:y1 - tile_y, x0 - tile_x:x1 - tile_x]
+        bgr_image = np.ascontiguousarray(bgra_image[:, :, :3])
+        alpha_image = np.ascontiguousarray(bgra_image[:, :, 3])
+
+        return bgr_image, alpha_image, bgra_image, bounding_box
+
+    def _get_sparse_tile_list(self, external_id, image_width, image_height):
+        self.logger.debug('_get_sparse_tile_list(%s)', external_id)
+
+        chunk_data = self.chunk_external_dict.get(external_id)
+        if chunk_data is None:
+            return None
+        binary_data = self._get_binary_data()
+
+        # 存在するブロックのインデックスを収集(画像範囲外のブロックは除外)
+        blocks_per_row, blocks_per_column = self._get_block_grid(
+            image_width,
+            image_height,
+        )
+        block_index_list = [
+            block_info['block_index']
+            for block_info in self._get_block_info_list(
+                chunk_data, binary_data) if block_info['exist']
+            and block_info['block_index'] < blocks_per_row * blocks_per_column
+        ]
+
+        # 存在するブロックのみ解凍
+        external_data = self._get_external_data_from_chunk(
+            chunk_data,
+            binary_data,
+            block_index_list,
+        )
+        if len(external_data) != len(
+                block_index_list) * self._BGR_COMPOSITE_BLOCK_SIZE:
+            self.logger.error('_get_sparse_tile_list()')
+            self.logger.error('    bgr_expected_size:Mismatch Size')
+            return None
+
+        # ブロック単位の画像に変換(4チャンネル目にはアルファ画像を格納)
+        block_data = np.frombuffer(external_data, dtype=np.uint8).reshape(
+            len(block_index_list), self._BGR_COMPOSITE_BLOCK_SIZE)
+        alpha_blocks = block_data[:, :self._BLOCK_SIZE].reshape(-1, 256, 256)
+        bgra_blocks = np.empty((len(block_index_list), 256, 256, 4),
+                               dtype=np.uint8)
+        bgra_blocks[...] = block_data[:, self._BLOCK_SIZE:].reshape(
+            -1, 256, 256, 4)
+        bgra_blocks[:, :, :, 3] = alpha_blocks
+
+        tile_list = []
+        for index, block_index in enumerate(block_index_list):
+            bgra_block = bgra_blocks[index]
+            tile_data = {
+                'block_index': block_index,
+                'block_x': block_index % blocks_per_column,
+                'block_y': block_index // blocks_per_column,
+                'bgr': np.ascontiguousarray(bgra_block[:, :, :3]),
+                'alpha': alpha_blocks[index],
+                'bgra': bgra_block,
+            }
+            tile_list.append(tile_data)
+
+        return tile_list
+
+    def _get_tile_bounding_box(self, tile_list, image_width, image_height):
+        # アルファ値が0より大きい画素を含む最小矩形(x, y, w, h)を算出
+        x0, y0, x1, y1 = None, None, None, None
+        for tile_data in tile_list:
+            alpha_block = tile_data['alpha']
+            row_exist = np.flatnonzero(alpha_block.any(axis=1))
+            if len(row_exist) == 0:
+                continue
+            column_exist = np.flatnonzero(alpha_block.any(axis=0))
+
+            tile_x = tile_data['block_x'] * 256
+            tile_y = tile_data['block_y'] * 256
+            tile_x0 = tile_x + int(column_exist[0])
+            tile_y0 = tile_y + int(row_exist[0])
+            tile_x1 = tile_x + int(column_exist[-1]) + 1
+            tile_y1 = tile_y + int(row_exist[-1]) + 1
+
+            x0 = tile_x0 if x0 is None else min(x0, tile_x0)
+            y0 = tile_y0 if y0 is None else min(y0, tile_y0)
+            x1 = tile_x1 if x1 is None else max(x1, tile_x1)
+            y1 = tile_y1 if y1 is None else max(y1, tile_y1)
+
+        if x0 is None:
+            return None
+
+        # パディング部分を除外
+        x1, y1 = min(x1, image_width), min(y1, image_height)
+        if x1 <= x0 or y1 <= y0:
+            return None
+
+        return x0, y0, x1 - x0, y1 - y0
+
+    def iter_tiles(self, canvas_id, layer_id, skip_empty=False):
+        # ブロックをファイル順に1つずつ解凍し、
+        # (ブロック列, ブロック行, BGR画像, アルファ画像) を返すジェネレーター
+        # ※画像全体を構築しないため、メモリ使用量は1ブロック分
+        # ※画像端のブロックはパディングを除いたサイズで返す
+        # ※skip_empty：Trueの場合、存在しない(透明な)ブロックは返さない
+        return self._iter_tiles(canvas_id, layer_id, skip_empty)
+
+    def _iter_tiles(
+        self,
+        canvas_id,
+        layer_id,
+        skip_empty=False,
+        sort_block=False,
+    ):
+        # ※sort_block：Trueの場合、ファイル順ではなくブロックインデックス順に返す
+        external_id = self._get_external_id(canvas_id, layer_id)
+        layer_thumbnail_data = self._get_layer_thumbnail(canvas_id, layer_id)
+        if external_id is None or layer_thumbnail_data is None:
+            return
+        chunk_data = self.chunk_external_dict.get(external_id)
+        if chunk_data is None:
+            return
+        binary_data = self._get_binary_data()
+
+        image_width = layer_thumbnail_data['thumbnail_canvas_width']
+        image_height = layer_thumbnail_data['thumbnail_canvas_height']
+        blocks_per_row, blocks_per_column = self._get_block_grid(
+            image_width,
+            image_height,
+        )
+
+        block_info_list = self._get_block_info_list(chunk_data, binary_data)
+        if sort_block:
+            block_info_list.sort(key=lambda block_info: block_info['block_index'])
+
+        for block_info in block_info_list:
+            block_index = block_info['block_index']
+            if block_index >= blocks_per_row * blocks_per_column:
+                continue
+            if (block_info['uncompressed_size'] !=
+                    self._BGR_COMPOSITE_BLOCK_SIZE):
+                self.logger.error('iter_tiles()')
+                self.logger.error('    bgr_expected_size:Mismatch Size')
+                continue
+            if skip_empty and not block_info['exist']:
+                continue
+
+            # ブロックデータ解凍(存在しないブロックはゼロ埋め)
+            block_data = self._decompress_block_list(binary_data, [block_info])
+
+            # ブロック位置とサイズ(パディング除去)
+            tile_x = block_index % blocks_per_column
+            tile_y = block_index // blocks_per_column
+            tile_width = min(256, image_width - tile_x * 256)
+            tile_height = min(256, image_height - tile_y * 256)
+
+            # アルファ画像とBGR画像に分割
+            block_data = np.frombuffer(block_data, dtype=np.uint8)
+            alpha_image = block_data[:self._BLOCK_SIZE].reshape(256, 256)
+            bgra_image = block_data[self._BLOCK_SIZE:].reshape(256, 256, 4)
+            alpha_image = alpha_image[:tile_height, :tile_width]
+            bgr_image = np.ascontiguousarray(
+                bgra_image[:tile_height, :tile_width, :3])
+
+            yield tile_x, tile_y, bgr_image, alpha_image
+
+    def export_layer(self, canvas_id, layer_id, path, format='npy'):
+        # レイヤー画像(BGRA)をブロック単位でファイルへ書き出す
+        # ※画像全体をメモリ上に構築しないため、キャンバスサイズに依らず
+        #   メモリ使用量はブロック数個分
+        # ※format：'npy'(メモリマップした .npy、BGRA)、
+        #          'tiff'(256×256タイル分割TIFF、RGBA、tifffileが必要)
+        external_id = self._get_external_id(canvas_id, layer_id)
+        layer_thumbnail_data = self._get_layer_thumbnail(canvas_id, layer_id)
+        if (external_id not in self.chunk_external_dict
+                or layer_thumbnail_data is None):
+            self.logger.error('export_layer()')
+            self.logger.error('    Error:Layer does not contain image')
+            return False
+        image_width = layer_thumbnail_data['thumbnail_canvas_width']
+        image_height = layer_thumbnail_data['thumbnail_canvas_height']
+
+        if format == 'npy':
+            self._export_layer_npy(
+                canvas_id,
+                layer_id,
+                path,
+                image_width,
+                image_height,
+            )
+        elif format == 'tiff':
+            if tifffile is None:
+                self.logger.error('export_layer()')
+                self.logger.error('    Error:tifffile is not installed')
+                return False
+            self._export_layer_tiff(
+                canvas_id,
+                layer_id,
+                path,
+                image_width,
+                image_height,
+            )
+        else:
+            self.logger.error('export_layer()')
+            self.logger.error('    Error:Unsupported format:%s', format)
+            return False
+
+        return True
+
+    def _export_layer_npy(
+        self,
+        canvas_id,
+        layer_id,
+        path,
+        image_width,
+        image_height,
+    ):
+        # .npyファイルをメモリマップし、存在するブロックのみ書き込む
+        # ※存在しないブロックは作成時のゼロ初期化のまま
+        bgra_image = np.lib.format.open_memmap(
+            path,
+            mode='w+',
+            dtype=np.uint8,
+            shape=(image_height, image_width, 4),
+        )
+        for tile_x, tile_y, bgr_image, alpha_image in self._iter_tiles(
+                canvas_id, layer_id, skip_empty=True):
+            x, y = tile_x * 256, tile_y * 256
+            h, w = alpha_image.shape
+            bgra_image[y:y + h, x:x + w, :3] = bgr_image
+            bgra_image[y:y + h, x:x + w, 3] = alpha_image
+        bgra_image.flush()
+        del bgra_image
+
+    def _export_layer_tiff(
+        self,
+        canvas_id,
+        layer_id,
+        path,
+        image_width,
+        image_height,
+    ):
+        blocks_per_row, blocks_per_column = self._get_block_grid(
+            image_width,
+            image_height,
+        )
+
+        # タイルをブロックインデックス順に返すジェネレーター
+        # ※ファイルに含まれないブロックは透明タイルとして補完
+        def generate_tile():
+            tile_iterator = self._iter_tiles(
+                canvas_id,
+                layer_id,
+                skip_empty=True,
+                sort_block=True,
+            )
+            tile = next(tile_iterator, None)
+            for block_index in range(blocks_per_row * blocks_per_column):
+                tile_x = block_index % blocks_per_column
+                tile_y = block_index // blocks_per_column
+
+                rgba_tile = np.zeros((256, 256, 4), dtype=np.uint8)
+                while tile is not None and (tile[1], tile[0]) < (tile_y,
+                                                                  tile_x):
+                    tile = next(tile_iterator, None)
+                if tile is not None and (tile[0], tile[1]) == (tile_x,
+                                                               tile_y):
+                    _, _, bgr_image, alpha_image = tile
+                    h, w = alpha_image.shape
+                    rgba_tile[:h, :w, :3] = bgr_image[:, :, ::-1]
+                    rgba_tile[:h, :w, 3] = alpha_image
+                    tile = next(tile_iterator, None)
+
+                yield rgba_tile
+
+        tifffile.imwrite(
+            path,
+            generate_tile(),
+            shape=(image_height, image_width, 4),
+            dtype=np.uint8,
+            tile=(256, 256),
+            photometric='rgb',
+            extrasamples=['unassalpha'],
+        )
+
+    def get_layer_array(self, canvas_id, layer_id):
+        # スライス時に必要なブロックのみ解凍する配列ライクなオブジェクトを取得
+        # ※np.asarray()等で配列化した場合は画像全体を構築
+        external_id = self._get_external_id(canvas_id, layer_id)
+        layer_thumbnail_data = self._get_layer_thumbnail(canvas_id, layer_id)
+        if (external_id not in self.chunk_external_dict
+                or layer_thumbnail_data is None):
+            return None
+
+        layer_array = LayerArray(
+            self,
+            external_id,
+            layer_thumbnail_data['thumbnail_canvas_width'],
+            layer_thumbnail_data['thumbnail_canvas_height'],
+        )
+
+        return layer_array
+
+    def composite(self, canvas_id, layer_ids=None):
+        # レイヤーを合成したフル解像度の画像を取得(通常合成のみ対応)
+        # ※layer_ids：合成対象のLayer IDのリスト(None:全レイヤー)
+        # ※非表示のレイヤー、非表示のフォルダ配下のレイヤーは合成しない
+        # ※不透明度(0～256)はレイヤーと親フォルダの値を乗算して適用
+        # ※合成モード、クリッピング、レイヤーマスクは未対応のため、
+        #   設定されている場合は警告を出力し、通常合成として扱う(近似結果)
+        # ※ブロック行単位で合成するため、作業領域は1ブロック行分
+        # ※全レイヤーで存在しないブロックは合成処理を行わない
+        start_time = time.time()
+
+        if layer_ids is not None:
+            layer_ids = set(layer_ids)
+
+        # 合成順(下層から上層)にレイヤーを並べる
+        # ※行きがけ順のため、親フォルダの表示状態、不透明度は子より先に算出済み
+        layer_order = []
+        hidden_layer_id_set = set()
+        layer_opacity_dict = {}
+        for layer_id in self._get_layer_order(canvas_id):
+            layer_data = self.layer_dict[(canvas_id, layer_id)]
+            layer_tree_data = self.layer_tree_dict[(canvas_id, layer_id)]
+            layer_visibility = layer_data['layer_visibility']
+            parent_id = layer_tree_data['parent_id']
+            if (parent_id in hidden_layer_id_set
+                    or (layer_visibility is not None
+                        and layer_visibility & 1 == 0)):
+                hidden_layer_id_set.add(layer_id)
+                continue
+
+            layer_opacity = layer_data['layer_opacity']
+            if layer_opacity is None:
+                layer_opacity = 256
+            layer_opacity_dict[layer_id] = (
+                layer_opacity_dict.get(parent_id, 1.0) * layer_opacity / 256)
+
+            # 未対応の合成設定(フォルダの設定は配下のレイヤーに影響)
+            is_folder = len(layer_tree_data['children_id_list']) > 0
+            if ((is_folder or layer_ids is None or layer_id in layer_ids)
+                    and (layer_data['layer_composite']
+                         or layer_data['layer_clip']
+                         or layer_data['layer_layer_mask_mipmap'])):
+                self.logger.warning('composite()')
+                self.logger.warning(
+                    '    Warning:Unsupported composite/clip/mask '
+                    '(Layer ID:%s), blended as normal', layer_id)
+
+            if layer_ids is None or layer_id in layer_ids:
+                layer_order.append(layer_id)
+
+        # 合成対象レイヤーのブロック情報を収集
+        # ※ブロックヘッダーの走査はレイヤー毎に1回のみ行い、
+        #   存在するブロックのブロック情報を保持して解凍時に再利用する
+        composite_layer_list = []
+        image_width, image_height = 0, 0
+        binary_data = self._get_binary_data()
+        for layer_id in layer_order:
+            external_id = self._get_external_id(canvas_id, layer_id)
             layer_thumbnail_data = self._get_layer_thumbnail(
                 canvas_id,
                 layer_id,
             )
+            chunk_data = self.chunk_external_dict.get(external_id)
+            if chunk_data is None or layer_thumbnail_data is None:
+                continue
+
+            layer_width = layer_thumbnail_data['thumbnail_canvas_width']
+            layer_height = layer_thumbnail_data['thumbnail_canvas_height']
+            image_width = max(image_width, layer_width)
+            image_height = max(image_height, layer_height)
+
+            block_info_list = self._get_block_info_list(
+                chunk_data,
+                binary_data,
+            )
+            blocks_per_row, blocks_per_column = self._get_block_grid(
+                layer_width,
+                layer_height,
+            )
+            composite_layer_data = {
+                'opacity': layer_opacity_dict[layer_id],
+                'blocks_per_column': blocks_per_column,
+                'blocks_per_row': blocks_per_row,
+                'block_info_dict': {
+                    block_info['block_index']: block_info
+                    for block_info in block_info_list if block_info['exist']
+                },
+            }
+            composite_layer_list.append(composite_layer_data)
+
+        if len(composite_layer_list) == 0:
+            return None, None, None
 
-            # External Dataを取得
-            external_data = self._get_layer_external_data(external_id)
+        # 合成結果
+        blocks_per_row, _ = self._get_block_grid(image_width, image_height)
+        bgra_image = np.zeros((image_height, image_width, 4), dtype=np.uint8)
 
-            # External Dataから画像を取得
-            image_width = layer_thumbnail_data['thumbnail_canvas_width']
-            image_height = layer_thumbnail_data['thumbnail_canvas_height']
-            if external_data is not None:
-                bgr_image, alpha_image = self._get_image_from_external_data(
+        for block_y in range(blocks_per_row):
+            # ブロック行の作業領域
+            # ※ブロックX → (乗算済みアルファのBGR、アルファ)
+            #   いずれかのレイヤーでブロックが存在する列のみ確保
+            row_block_dict = {}
+
+            for composite_layer_data in composite_layer_list:
+                if block_y >= composite_layer_data['blocks_per_row']:
+                    continue
+
+                # 該当ブロック行で存在するブロックのみ解凍
+                blocks_per_column = composite_layer_data['blocks_per_column']
+                block_info_dict = composite_layer_data['block_info_dict']
+                block_x_list = [
+                    block_x for block_x in range(blocks_per_column)
+                    if block_y * blocks_per_column + block_x in block_info_dict
+                ]
+                if len(block_x_list) == 0:
+                    continue
+                external_data = self._decompress_block_list(
+                    binary_data,
+                    [
+                        block_info_dict[block_y * blocks_per_column + block_x]
+                        for block_x in block_x_list
+                    ],
+                )
+                if len(external_data) != len(
+                        block_x_list) * self._BGR_COMPOSITE_BLOCK_SIZE:
+                    self.logger.error('composite()')
+                    self.logger.error('    bgr_expected_size:Mismatch Size')
+                    continue
+                block_data = np.frombuffer(
                     external_data,
-                    image_width,
-                    image_height,
+                    dtype=np.uint8,
+                ).reshape(len(block_x_list), self._BGR_COMPOSITE_BLOCK_SIZE)
+
+                # 通常合成(ブロック単位でベクトル化)
+                for index, block_x in enumerate(block_x_list):
+                    if block_x not in row_block_dict:
+                        row_block_dict[block_x] = (
+                            np.zeros((256, 256, 3), dtype=np.float32),
+                            np.zeros((256, 256), dtype=np.float32),
+                        )
+                    block_bgr, block_alpha = row_block_dict[block_x]
+
+                    src_alpha = block_data[index, :self._BLOCK_SIZE].reshape(
+                        256, 256).astype(np.float32) / 255
+                    src_alpha *= composite_layer_data['opacity']
+                    src_bgr = block_data[index, self._BLOCK_SIZE:].reshape(
+                        256, 256, 4)[:, :, :3].astype(np.float32) / 255
+
+                    inverse_alpha = 1 - src_alpha
+                    block_bgr[:] = (
+                        src_bgr * src_alpha[:, :, np.newaxis] +
+                        block_bgr * inverse_alpha[:, :, np.newaxis])
+                    block_alpha[:] = src_alpha + block_alpha * inverse_alpha
+
+            # 乗算済みアルファを戻して書き込み(ブロックが存在する列のみ)
+            y0 = block_y * 256
+            y1 = min(y0 + 256, image_height)
+            for block_x, (block_bgr, block_alpha) in row_block_dict.items():
+                x0 = block_x * 256
+                x1 = min(x0 + 256, image_width)
+                if x0 >= x1:
+                    continue
+                block_bgr = block_bgr[:y1 - y0, :x1 - x0]
+                block_alpha = block_alpha[:y1 - y0, :x1 - x0]
+                np.divide(
+                    block_bgr,
+                    block_alpha[:, :, np.newaxis],
+                    out=block_bgr,
+                    where=block_alpha[:, :, np.newaxis] > 0,
                 )
+                bgra_image[y0:y1, x0:x1, :3] = np.rint(block_bgr * 255)
+                bgra_image[y0:y1, x0:x1, 3] = np.rint(block_alpha * 255)
 
-                # 画像とアルファ画像を結合
-                temp_alpha_image = alpha_image.reshape([*alpha_image.shape, 1])
-                bgra_image = np.concatenate([bgr_image, temp_alpha_image], 2)
+        bgr_image = np.ascontiguousarray(bgra_image[:, :, :3])
+        alpha_image = np.ascontiguousarray(bgra_image[:, :, 3])
 
         elapsed_time = (time.time() - start_time) * 1000
-        self.logger.debug('get_raster_data():{:.2f}ms'.format(elapsed_time))
+        self.logger.debug('composite():%.2fms', elapsed_time)
+
+        return bgr_image, alpha_image, bgra_image
+
+    def _get_layer_order(self, canvas_id):
+        # 下層から上層の順(ツリーの行きがけ順)のLayer ID一覧
+        return self.layer_order_dict.get(canvas_id, [])
+
+    def get_all_raster_data(self, workers=None):
+        # 全レイヤーのラスターデータを並列に取得
+        # ※戻り値：{(Canvas ID, Layer ID): (BGR画像, アルファ画像, BGRA画像)}
+        all_raster_data = {}
+        for canvas_id, layer_id, raster_data in self.iter_raster_data(
+                workers=workers):
+            all_raster_data[(canvas_id, layer_id)] = raster_data
+
+        return all_raster_data
+
+    def iter_raster_data(self, layer_ids=None, workers=None):
+        # 指定レイヤーのラスターデータをプロセスプールで並列に取得し、
+        # 完了順に (Canvas ID, Layer ID, (BGR画像, アルファ画像, BGRA画像)) を返す
+        # ※layer_ids：(Canvas ID, Layer ID) のリスト(None:全レイヤー)
+        # ※各ワーカーにはファイルパスとチャンク位置のみを渡し、
+        #   ワーカー側でファイルをメモリマップして該当ブロックを読み出す
+        if layer_ids is None:
+            layer_ids = [(layer_data['canvas_id'], layer_data['main_id'])
+                         for layer_data in self.layer_list]
+
+            # 全レイヤー対象の場合はレコード毎に検索せず、インデックスを一括作成
+            self._create_index('external_id')
+            self._create_index('layer_thumbnail')
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        # デコード対象を収集
+        job_list = []
+        for canvas_id, layer_id in layer_ids:
+            external_id = self._get_external_id(canvas_id, layer_id)
+            layer_thumbnail_data = self._get_layer_thumbnail(
+                canvas_id,
+                layer_id,
+            )
+            if external_id is None or layer_thumbnail_data is None:
+                yield canvas_id, layer_id, (None, None, None)
+                continue
+
+            job = (
+                canvas_id,
+                layer_id,
+                external_id,
+                layer_thumbnail_data['thumbnail_canvas_width'],
+                layer_thumbnail_data['thumbnail_canvas_height'],
+            )
+            job_list.append(job)
+
+        # ワーカー数1、またはデコード対象が1つ以下の場合は逐次処理
+        if workers <= 1 or len(job_list) <= 1:
+            for job in job_list:
+                canvas_id, layer_id = job[0], job[1]
+                raster_data = self._get_raster_data_from_external_id(*job[2:])
+                yield canvas_id, layer_id, raster_data
+            return
+
+        chunk_external_dict = {
+            external_id: self.chunk_external_dict.get(external_id)
+            for _, _, external_id, _, _ in job_list
+        }
+        # ※呼び出し元が途中で反復を終了した場合(break、close())は、
+        #   未実行のデコードをキャンセルし、実行中のデコードのみ完了を待つ
+        executor = ProcessPoolExecutor(
+            max_workers=min(workers, len(job_list)),
+            initializer=_init_raster_worker,
+            initargs=(
+                self.filepath,
+                chunk_external_dict,
+                self.logger.name,
+                self.get_disk_cache_info(),
+            ),
+        )
+        try:
+            future_dict = {
+                executor.submit(_decode_raster_worker, job[2:]): job
+                for job in job_list
+            }
+            for future in as_completed(future_dict):
+                canvas_id, layer_id = future_dict[future][0:2]
+
+                # BGR画像、アルファ画像はBGRA画像から復元
+                bgra_image = future.result()
+                bgr_image, alpha_image = None, None
+                if bgra_image is not None:
+                    bgr_image = np.ascontiguousarray(bgra_image[:, :, :3])
+                    alpha_image = np.ascontiguousarray(bgra_image[:, :, 3])
+
+                yield canvas_id, layer_id, (bgr_image, alpha_image, bgra_image)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_raster_data_from_external_id(
+        self,
+        external_id,
+        image_width,
+        image_height,
+        roi=None,
+    ):
+        bgr_image, alpha_image, bgra_image = None, None, None
+
+        # 取得範囲に該当するブロックインデックスを算出
+        block_index_list = None
+        if roi is not None:
+            roi = self._clip_roi(roi, image_width, image_height)
+            if roi is None:
+                self.logger.error('get_raster_data()')
+                self.logger.error('    Error:ROI is out of image')
+                return bgr_image, alpha_image, bgra_image
+
+            block_range = self._get_block_range(roi)
+            block_index_list = self._get_block_index_list(
+                block_range,
+                image_width,
+            )
+
+        # External Dataを取得
+        external_data = self._get_layer_external_data(
+            external_id,
+            block_index_list,
+        )
+
+        # External Dataから画像を取得
+        if external_data is not None:
+            image_data = self._get_image_from_external_data(
+                external_data,
+                image_width,
+                image_height,
+                roi,
+            )
+            bgr_image, alpha_image, bgra_image = image_data
+
+        return bgr_image, alpha_image, bgra_image
+
+    def _get_mipmap_raster_data(self, canvas_id, layer_id, roi, scale):
+        bgr_image, alpha_image, bgra_image = None, None, None
+
+        # 指定縮小率以上で、データが格納されている最小の段階を選択
+        # ※縮小段階のデータが保存されていない場合は、より大きい段階から縮小する
+        mipmap_level_list = self.get_mipmap_level_list(canvas_id, layer_id)
+        candidate_list = [
+            mipmap_level_data for mipmap_level_data in mipmap_level_list
+            if mipmap_level_data['exist']
+            and mipmap_level_data['scale'] >= scale
+        ]
+        if len(candidate_list) == 0:
+            self.logger.error('_get_mipmap_raster_data()')
+            self.logger.error('    Error:Mipmap not found (scale:%s)', scale)
+            return bgr_image, alpha_image, bgra_image
+        mipmap_level_data = min(
+            candidate_list,
+            key=lambda mipmap_level_data: mipmap_level_data['scale'],
+        )
+        self.logger.debug('    mipmap_level_data:%s', mipmap_level_data)
+
+        # 指定縮小率での画像サイズと取得範囲
+        base_level_data = mipmap_level_list[0]
+        image_width = int(
+            math.ceil(base_level_data['width'] * scale /
+                      base_level_data['scale']))
+        image_height = int(
+            math.ceil(base_level_data['height'] * scale /
+                      base_level_data['scale']))
+        if roi is None:
+            roi = (0, 0, image_width, image_height)
+        roi = self._clip_roi(roi, image_width, image_height)
+        if roi is None:
+            self.logger.error('get_raster_data()')
+            self.logger.error('    Error:ROI is out of image')
+            return bgr_image, alpha_image, bgra_image
+
+        # 選択した段階の縮小率が一致する場合はそのまま取得
+        if mipmap_level_data['scale'] == scale:
+            return self._get_raster_data_from_external_id(
+                mipmap_level_data['external_id'],
+                mipmap_level_data['width'],
+                mipmap_level_data['height'],
+                roi,
+            )
+
+        # 一致しない場合は、選択した段階の対応範囲を取得して縮小
+        ratio = mipmap_level_data['scale'] / scale
+        x, y, w, h = roi
+        level_x0 = int(math.floor(x * ratio))
+        level_y0 = int(math.floor(y * ratio))
+        level_x1 = min(int(math.ceil((x + w) * ratio)),
+                       mipmap_level_data['width'])
+        level_y1 = min(int(math.ceil((y + h) * ratio)),
+                       mipmap_level_data['height'])
+        image_data = self._get_raster_data_from_external_id(
+            mipmap_level_data['external_id'],
+            mipmap_level_data['width'],
+            mipmap_level_data['height'],
+            (level_x0, level_y0, level_x1 - level_x0, level_y1 - level_y0),
+        )
+        if image_data[2] is not None:
+            bgra_image = cv2.resize(
+                image_data[2],
+                (w, h),
+                interpolation=cv2.INTER_AREA,
+            )
+            bgr_image = np.ascontiguousarray(bgra_image[:, :, :3])
+            alpha_image = np.ascontiguousarray(bgra_image[:, :, 3])
 
         return bgr_image, alpha_image, bgra_image
 
     def _read_clip_studio_file(self, filepath):
-        self.logger.debug('_read_clip_studio_file(' + filepath + ')')
+        self.logger.debug('_read_clip_studio_file(%s)', filepath)
 
         # chunk_header = None
         chunk_external_list = []
@@ -115,36 +1790,47 @@ class CspTool(object):
         chunk_data_list = chunk_data_info[0]
         binary_data = chunk_data_info[1]
         sqlite_binary_data = chunk_data_info[2]
+        chunk_external_dict = chunk_data_info[3]
 
         # chunk_header = chunk_data_list[0]
         chunk_external_list = chunk_data_list[1:-2]
         # chunk_sqldb = chunk_data_list[-2]
         # chunk_footer = chunk_data_list[-1]
 
-        return chunk_external_list, binary_data, sqlite_binary_data
+        return chunk_external_list, binary_data, sqlite_binary_data, chunk_external_dict
 
     def _read_chunk_data(self, filepath):
         chunk_data_list = []
+        chunk_external_dict = {}
         binary_data = None
         sqlite_binary_data = None
 
-        self.logger.debug('_read_chunk_data(' + filepath + ')')
+        self.logger.debug('_read_chunk_data(%s)', filepath)
 
         with open(filepath, mode='rb') as binary_file:
-            binary_data = binary_file.read()
+            # 遅延読み出し時はチャンクヘッダー間をシークして読み出し
+            if self.lazy_load:
+                return self._seek_chunk_data(binary_file)
+
+            # ファイル読み出し
+            binary_data = self._read_binary_data(binary_file)
             data_size = len(binary_data)
 
+            if self._metrics is not None:
+                start_time = time.perf_counter()
+
             offset = 0
 
             # 8バイト：マジックナンバー
             csf_magic_number = struct.unpack_from('8s', binary_data, offset)[0]
             csf_magic_number = csf_magic_number.decode()
             offset += 8
-            self.logger.debug('    CSF Magic Number:' + csf_magic_number)
+            self.logger.debug('    CSF Magic Number:%s', csf_magic_number)
 
             # 16バイト：読み飛ばし
             offset += 16
 
+            is_debug = self.logger.isEnabledFor(logging.DEBUG)
             while offset < data_size:
                 # チャンク開始位置
                 chunk_start_position = offset
@@ -172,7 +1858,17 @@ class CspTool(object):
                 }
                 chunk_data_list.append(chunk_data)
 
-                self.logger.debug('    ' + str(chunk_data))
+                # External IDとチャンクの対応を登録
+                if chunk_type == 'CHNKExta':
+                    external_id = self._get_external_id_from_chunk(
+                        chunk_data,
+                        binary_data,
+                    )
+                    chunk_data['external_id'] = external_id
+                    chunk_external_dict.setdefault(external_id, chunk_data)
+
+                if is_debug:
+                    self.logger.debug('    %s', chunk_data)
 
             # SQLiteチャンク開始位置確認
             sqlite_chunk_start_position = 0
@@ -183,312 +1879,549 @@ class CspTool(object):
 
             sqlite_offset = sqlite_chunk_start_position + 16
 
-            # SQLiteファイル保存
-            sqlite_binary_data = copy.deepcopy(binary_data[sqlite_offset:])
+            # SQLiteデータ(コピーせずにmemoryviewで参照)
+            sqlite_binary_data = memoryview(binary_data)[sqlite_offset:]
 
-        return chunk_data_list, binary_data, sqlite_binary_data
+            if self._metrics is not None:
+                self._metrics.add_time('chunk_scan',
+                                       time.perf_counter() - start_time)
 
-    def _read_sqlite_data(
-        self,
-        sqlite_binary_data,
-        temp_db_filename='__temp__.db',
-    ):
-        self.logger.debug('_read_sqlite_data()')
+        return chunk_data_list, binary_data, sqlite_binary_data, chunk_external_dict
 
-        # SQLiteファイル 一次保存
-        with open(temp_db_filename, mode="wb") as f:
-            f.write(sqlite_binary_data)
+    def _seek_chunk_data(self, binary_file):
+        chunk_data_list = []
+        chunk_external_dict = {}
+        sqlite_binary_data = None
 
-        # dbファイル接続
-        connect = sqlite3.connect(temp_db_filename)
+        self.logger.debug('_seek_chunk_data()')
 
-        # CanvasPreview
-        self.logger.debug('    CanvasPreview')
-        canvas_preview_list = []
-        query_results = self._exec_sqlite_query(
-            connect,
-            "SELECT MainId, CanvasId, ImageData, ImageWidth, ImageHeight FROM CanvasPreview;",
-        )
-        for query_result in query_results:
-            main_id = query_result[0]
-            canvas_id = query_result[1]
-            image_data = query_result[2]
-            image_width = query_result[3]
-            image_height = query_result[4]
-
-            canvas_preview_data = {
-                'main_id': main_id,
-                'canvas_id': canvas_id,
-                'image_data': image_data,
-                'image_width': image_width,
-                'image_height': image_height,
-            }
-            canvas_preview_list.append(canvas_preview_data)
-
-            self.logger.debug('        {' + "'main_id':" + str(main_id) +
-                              ", 'canvas_id':" + str(canvas_id) +
-                              ", 'image_width':" + str(image_width) +
-                              ", 'image_height':" + str(image_height) + '}')
-
-        # Layer
-        self.logger.debug('    Layer')
-        layer_list = []
-        query_results = self._exec_sqlite_query(
-            connect,
-            "SELECT MainId, CanvasId, LayerName, LayerUuid, LayerRenderMipmap, LayerRenderThumbnail, LayerNextIndex, LayerFirstChildIndex, LayerType FROM Layer;",
-        )
-        for query_result in query_results:
-            main_id = query_result[0]
-            canvas_id = query_result[1]
-            layer_name = query_result[2]
-            layer_uuid = query_result[3]
-            layer_render_mipmap = query_result[4]
-            layer_render_thumbnail = query_result[5]
-            layer_next_index = query_result[6]
-            layer_first_child_index = query_result[7]
-            layer_type = query_result[8]
-
-            layer_data = {
-                'main_id': main_id,
-                'canvas_id': canvas_id,
-                'layer_name': layer_name,
-                'layer_uuid': layer_uuid,
-                'layer_render_mipmap': layer_render_mipmap,
-                'layer_render_thumbnail': layer_render_thumbnail,
-                'layer_next_index': layer_next_index,
-                'layer_first_child_index': layer_first_child_index,
-                'layer_type': layer_type,
-            }
-            layer_list.append(layer_data)
+        if self._metrics is not None:
+            start_time = time.perf_counter()
 
-            self.logger.debug('        ' + str(layer_data))
+        data_size = os.fstat(binary_file.fileno()).st_size
 
-        # LayerThumbnail
-        self.logger.debug('    LayerThumbnail')
-        layer_thumbnail_list = []
-        query_results = self._exec_sqlite_query(
-            connect,
-            "SELECT MainId, CanvasId, LayerId, ThumbnailCanvasWidth, ThumbnailCanvasHeight, ThumbnailOffscreen FROM LayerThumbnail;",
-        )
-        for query_result in query_results:
-            main_id = query_result[0]
-            canvas_id = query_result[1]
-            layer_id = query_result[2]
-            thumbnail_canvas_width = query_result[3]
-            thumbnail_canvas_height = query_result[4]
-            thumbnail_offscreen = query_result[5]
-
-            layer_thumbnail_data = {
-                'main_id': main_id,
-                'canvas_id': canvas_id,
-                'layer_id': layer_id,
-                'thumbnail_canvas_width': thumbnail_canvas_width,
-                'thumbnail_canvas_height': thumbnail_canvas_height,
-                'thumbnail_offscreen': thumbnail_offscreen,
-            }
-            layer_thumbnail_list.append(layer_thumbnail_data)
+        offset = 0
 
-            self.logger.debug('        ' + str(layer_thumbnail_data))
+        # 8バイト：マジックナンバー
+        csf_magic_number = binary_file.read(8).decode()
+        offset += 8
+        self.logger.debug('    CSF Magic Number:%s', csf_magic_number)
 
-        # Offscreen
-        self.logger.debug('    Offscreen')
-        offscreen_list = []
-        query_results = self._exec_sqlite_query(
-            connect,
-            "SELECT MainId, CanvasId, LayerId, BlockData FROM Offscreen;",
-        )
-        for query_result in query_results:
-            main_id = query_result[0]
-            canvas_id = query_result[1]
-            layer_id = query_result[2]
-            block_data = query_result[3].decode()
-
-            offscreen_data = {
-                'main_id': main_id,
-                'canvas_id': canvas_id,
-                'layer_id': layer_id,
-                'block_data': block_data,
-            }
-            offscreen_list.append(offscreen_data)
+        # 16バイト：読み飛ばし
+        offset += 16
 
-            self.logger.debug('        ' + str(offscreen_data))
+        is_debug = self.logger.isEnabledFor(logging.DEBUG)
+        while offset < data_size:
+            # チャンク開始位置
+            chunk_start_position = offset
+            binary_file.seek(offset)
 
-        # Mipmap
-        self.logger.debug('    Mipmap')
-        mipmap_list = []
-        query_results = self._exec_sqlite_query(
-            connect,
-            "SELECT MainId, CanvasId, LayerId, MipmapCount, BaseMipmapInfo FROM Mipmap;",
-        )
-        for query_result in query_results:
-            main_id = query_result[0]
-            canvas_id = query_result[1]
-            layer_id = query_result[2]
-            mipmap_count = query_result[3]
-            base_mipmap_info = query_result[4]
-
-            mipmap_data = {
-                'main_id': main_id,
-                'canvas_id': canvas_id,
-                'layer_id': layer_id,
-                'mipmap_count': mipmap_count,
-                'base_mipmap_info': base_mipmap_info,
-            }
-            mipmap_list.append(mipmap_data)
+            # 8バイト：チャンクタイプ、ビッグエンディアン8バイト：チャンクサイズ
+            chunk_type, chunk_size = struct.unpack('>8sQ', binary_file.read(16))
+            chunk_type = chunk_type.decode()
+            offset += 16
 
-            self.logger.debug('        ' + str(mipmap_data))
+            # チャンクサイズ読み飛ばし
+            offset += chunk_size
 
-        # MipmapInfo
-        self.logger.debug('    MipmapInfo')
-        mipmap_info_list = []
-        query_results = self._exec_sqlite_query(
-            connect,
-            "SELECT MainId, CanvasId, LayerId, ThisScale, Offscreen, NextIndex FROM MipmapInfo;",
-        )
-        for query_result in query_results:
-            main_id = query_result[0]
-            canvas_id = query_result[1]
-            layer_id = query_result[2]
-            this_scale = query_result[3]
-            offscreen = query_result[4]
-            next_index = query_result[5]
-
-            mipmap_info_data = {
-                'main_id': main_id,
-                'canvas_id': canvas_id,
-                'layer_id': layer_id,
-                'this_scale': this_scale,
-                'offscreen': offscreen,
-                'next_index': next_index,
-            }
-            mipmap_info_list.append(mipmap_info_data)
+            # チャンク終了位置
+            chunk_end_position = offset
 
-            self.logger.debug('        ' + str(mipmap_info_data))
+            chunk_data = {
+                'type': chunk_type,
+                'size': chunk_size,
+                'chunk_start_position': chunk_start_position,
+                'chunk_end_position': chunk_end_position,
+            }
+            chunk_data_list.append(chunk_data)
+
+            if chunk_type == 'CHNKExta':
+                # ビッグエンディアン8バイト：External IDサイズ、External ID
+                external_id_size = struct.unpack('>Q', binary_file.read(8))[0]
+                external_id = binary_file.read(external_id_size).decode()
+
+                # External IDとチャンクの対応を登録
+                chunk_data['external_id'] = external_id
+                chunk_external_dict.setdefault(external_id, chunk_data)
+            elif chunk_type == 'CHNKSQLi':
+                # SQLiteデータのみ読み出し
+                sqlite_binary_data = binary_file.read(chunk_size)
+
+            if is_debug:
+                self.logger.debug('    %s', chunk_data)
+
+        if self._metrics is not None:
+            self._metrics.add_time('chunk_scan',
+                                   time.perf_counter() - start_time)
+            # マジックナンバー、チャンクヘッダー、External ID、SQLiteデータ
+            read_size = 8 + 16 * len(chunk_data_list)
+            for external_id in chunk_external_dict.keys():
+                read_size += 8 + len(external_id)
+            if sqlite_binary_data is not None:
+                read_size += len(sqlite_binary_data)
+            self._metrics.add('bytes_read', read_size)
+
+        return chunk_data_list, None, sqlite_binary_data, chunk_external_dict
+
+    def _read_binary_data(self, binary_file):
+        if self._metrics is not None:
+            start_time = time.perf_counter()
+
+        # ファイル読み出し
+        # ※メモリマップ時はチャンクやブロックをmemoryview経由で参照し、
+        #   実際にアクセスした範囲のみ読み込まれる
+        if self.use_mmap:
+            self._mmap = mmap.mmap(
+                binary_file.fileno(),
+                0,
+                access=mmap.ACCESS_READ,
+            )
+            binary_data = memoryview(self._mmap)
+        else:
+            binary_data = binary_file.read()
 
-        # dbファイルクローズ
-        connect.close()
+        if self._metrics is not None:
+            self._metrics.add_time('file_read',
+                                   time.perf_counter() - start_time)
+            if not self.use_mmap:
+                self._metrics.add('bytes_read', len(binary_data))
+
+        return binary_data
+
+    def _get_binary_data(self):
+        # 遅延読み出し時は初回アクセスでファイルを読み出す
+        # ※複数スレッドから同時に呼ばれても読み出しは1回のみ
+        binary_data = self.binary_data
+        if binary_data is None:
+            self._check_closed()
+            with self._lock:
+                if self.binary_data is None:
+                    self.logger.debug('_get_binary_data(%s)', self.filepath)
+                    with open(self.filepath, mode='rb') as binary_file:
+                        self.binary_data = self._read_binary_data(
+                            binary_file)
+                binary_data = self.binary_data
+
+        return binary_data
+
+    def _read_sqlite_table(self, table_name, where=None, params=(), limit=None):
+        # 該当テーブルを読み出し、1行を1つの辞書としたリストを返す
+        # ※where、params：検索条件(未指定時は全件)、limit：最大件数
+        self.logger.debug('_read_sqlite_table(%s)', table_name)
+
+        if self._metrics is not None:
+            start_time = time.perf_counter()
+
+        column_list = self._SQLITE_TABLE_DICT[table_name]
+        query = 'SELECT ' + ', '.join(
+            column_name for column_name, _ in column_list)
+        query += ' FROM ' + table_name
+        if where is not None:
+            query += ' WHERE ' + where
+        if limit is not None:
+            query += ' LIMIT ' + str(int(limit))
+        query += ';'
+
+        # ※SQLite接続は複数スレッドで共有するため排他して実行
+        with self._sqlite_lock:
+            self._check_closed()
+            query_results = self._exec_sqlite_query(
+                self._sqlite_connect,
+                query,
+                params,
+            )
 
-        # SQLite一時ファイル削除
-        os.remove(temp_db_filename)
+        # 行毎のデバッグログはログレベル有効時のみ出力
+        is_debug = self.logger.isEnabledFor(logging.DEBUG)
 
-        return canvas_preview_list, layer_list, layer_thumbnail_list, offscreen_list, mipmap_list, mipmap_info_list
+        data_list = []
+        for query_result in query_results:
+            data = {
+                key: value
+                for (_, key), value in zip(column_list, query_result)
+            }
+            data_list.append(data)
+
+            if is_debug:
+                self.logger.debug(
+                    '        %s', {
+                        key: value
+                        for key, value in data.items() if key != 'image_data'
+                    })
+
+        if self._metrics is not None:
+            self._metrics.add_time('sqlite_load',
+                                   time.perf_counter() - start_time)
+
+        return data_list
+
+    def _open_sqlite_connection(self, sqlite_binary_data):
+        # Python 3.11以降：バイト列をインメモリdbへ直接展開
+        if hasattr(sqlite3.Connection, 'deserialize'):
+            connect = sqlite3.connect(':memory:', check_same_thread=False)
+            connect.deserialize(sqlite_binary_data)
+            return connect
+
+        # それ以外：専用の一時ファイルを経由してインメモリdbへ複製
+        # ※一時ファイル名は毎回一意のため、複数インスタンスで衝突しない
+        temp_db_fd, temp_db_filename = tempfile.mkstemp(suffix='.db')
+        try:
+            with os.fdopen(temp_db_fd, mode='wb') as f:
+                f.write(sqlite_binary_data)
+
+            file_connect = sqlite3.connect(temp_db_filename)
+            connect = sqlite3.connect(':memory:', check_same_thread=False)
+            try:
+                file_connect.backup(connect)
+            finally:
+                file_connect.close()
+        finally:
+            os.remove(temp_db_filename)
+
+        return connect
 
     def _exec_sqlite_query(
         self,
         connect,
         query,
+        params=(),
     ):
         cursor = connect.cursor()
-        cursor.execute(query)
+        cursor.execute(query, params)
         query_results = cursor.fetchall()
         cursor.close()
 
         return query_results
 
-    def _get_external_id(self, canvas_id, layer_id):
-        self.logger.debug('_get_external_id(' + str(canvas_id) + ',' +
-                          str(layer_id) + ')')
-
-        # Layer検索
-        layer_data = None
-        for temp_layer_data in self.layer_list:
-            temp_layer_id = temp_layer_data['main_id']
-            temp_canvas_id = temp_layer_data['canvas_id']
-            if temp_layer_id == layer_id and temp_canvas_id == canvas_id:
-                layer_data = temp_layer_data
-                break
-        self.logger.debug('    layer_data:' + str(layer_data))
+    def _create_index(self, index_name):
+        # SQLiteテーブルを読み出し、検索用インデックスを作成
+        # ※作成済みの場合は何もしない
+        with self._sqlite_lock:
+            if index_name in self._index_set:
+                return
+
+            self.logger.debug('_create_index(%s)', index_name)
+
+            index_data_dict = {}
+            if index_name == 'canvas_preview':
+                index_data_dict['canvas_preview_list'] = \
+                    self._read_sqlite_table('CanvasPreview')
+            elif index_name == 'external_id':
+                index_data_dict.update(self._create_external_id_index())
+            else:
+                # (Canvas ID, Main ID)、または Main ID をキーとした辞書を作成
+                # ※キー重複時は従来の線形探索と同様に先頭のデータを優先
+                table_name, _, key_name_list = self._SQLITE_INDEX_DICT[
+                    index_name]
+                data_list = self._read_sqlite_table(table_name)
+                index_dict = {}
+                for data in data_list:
+                    index_dict.setdefault(
+                        self._get_index_key(data, key_name_list),
+                        data,
+                    )
+                index_data_dict[index_name + '_list'] = data_list
+                index_data_dict[index_name + '_dict'] = index_dict
+
+                # レイヤー階層
+                if index_name == 'layer':
+                    index_data_dict.update(
+                        self._create_layer_tree_index(index_dict))
+
+            # インデックスを読み取り専用化して設定
+            self._freeze_index(index_data_dict)
+            self._index_set.add(index_name)
+
+    def _get_index_key(self, data, key_name_list):
+        if len(key_name_list) == 1:
+            return data[key_name_list[0]]
+
+        return tuple(data[key_name] for key_name in key_name_list)
+
+    def _get_sqlite_record(self, index_name, key):
+        # インデックス作成済みの場合はインデックスから、
+        # 未作成の場合はSQLiteから該当するレコードのみを検索
+        if index_name in self._index_set:
+            return getattr(self, index_name + '_dict').get(key)
+
+        table_name, key_column_list, _ = self._SQLITE_INDEX_DICT[index_name]
+        if not isinstance(key, tuple):
+            key = (key, )
+        data_list = self._read_sqlite_table(
+            table_name,
+            where=' AND '.join(key_column + ' = ?'
+                               for key_column in key_column_list),
+            params=key,
+            limit=1,
+        )
+        if len(data_list) == 0:
+            return None
+
+        return data_list[0]
 
+    def _create_external_id_index(self):
+        # 全レイヤーの Layer → Mipmap → MipmapInfo → Offscreen → External ID
+        # を事前解決
+        # ※関連テーブルのインデックスを先に作成し、レコード毎の検索を行わない
+        for index_name in ['layer', 'mipmap', 'mipmap_info', 'offscreen']:
+            self._create_index(index_name)
+
+        external_id_dict = {}
+        mipmap_chain_dict = {}
+        for canvas_id, layer_id in self.layer_dict.keys():
+            mipmap_chain = self._get_mipmap_chain(canvas_id, layer_id)
+            if mipmap_chain is None:
+                continue
+            mipmap_chain_dict[(canvas_id, layer_id)] = mipmap_chain
+
+            external_id = self._get_external_id_from_mipmap_chain(
+                mipmap_chain)
+            if external_id is not None:
+                external_id_dict[(canvas_id, layer_id)] = external_id
+
+        index_data_dict = {
+            'external_id_dict': external_id_dict,
+            'mipmap_chain_dict': mipmap_chain_dict,
+        }
+
+        return index_data_dict
+
+    def _get_mipmap_chain(self, canvas_id, layer_id):
+        # Layer → Mipmap → MipmapInfo(NextIndexを辿る) のミップマップ段階一覧
+        # ※該当するLayer、Mipmapが存在しない場合はNone
+        if 'external_id' in self._index_set:
+            return self.mipmap_chain_dict.get((canvas_id, layer_id))
+
+        layer_data = self._get_sqlite_record('layer', (canvas_id, layer_id))
         if layer_data is None:
             return None
+        mipmap_data = self._get_sqlite_record(
+            'mipmap',
+            layer_data['layer_render_mipmap'],
+        )
+        if mipmap_data is None:
+            return None
 
-        # LayerThumbnail検索
-        layer_thumbnail_data = None
-        for temp_layer_thumbnail_data in self.layer_thumbnail_list:
-            temp_layer_id = temp_layer_thumbnail_data['main_id']
-            temp_canvas_id = temp_layer_thumbnail_data['canvas_id']
-            if temp_layer_id == layer_id and temp_canvas_id == canvas_id:
-                layer_thumbnail_data = temp_layer_thumbnail_data
-                break
-        self.logger.debug('    layer_thumbnail_data:' +
-                          str(layer_thumbnail_data))
-
-        # MipMap検索
-        mipmap_data = None
-        for temp_mipmap_data in self.mipmap_list:
-            temp_mipmap_id = temp_mipmap_data['main_id']
-            mipmap_id = layer_data['layer_render_mipmap']
-            if temp_mipmap_id == mipmap_id:
-                mipmap_data = temp_mipmap_data
-                break
-        self.logger.debug('    mipmap_data:' + str(mipmap_data))
-
-        # MipmapInfo検索
-        mipmap_detail_data = None
-        for temp_mipmap_detail_data in self.mipmap_info_list:
-            temp_mipmap_info_id = temp_mipmap_detail_data['main_id']
-            mipmap_info_id = mipmap_data['base_mipmap_info']
-            if temp_mipmap_info_id == mipmap_info_id:
-                mipmap_detail_data = temp_mipmap_detail_data
-                break
-        self.logger.debug('    mipmap_detail_data:' + str(mipmap_detail_data))
-
-        # Offscreen検索
-        offscreen_data = None
-        for temp_offscreen_data in self.offscreen_list:
-            temp_offscreen_id = temp_offscreen_data['main_id']
-            offscreen_id = mipmap_detail_data['offscreen']
-            if temp_offscreen_id == offscreen_id:
-                offscreen_data = temp_offscreen_data
+        mipmap_chain = []
+        mipmap_info_id = mipmap_data['base_mipmap_info']
+        while True:
+            mipmap_detail_data = self._get_sqlite_record(
+                'mipmap_info',
+                mipmap_info_id,
+            )
+            if mipmap_detail_data is None or \
+                    mipmap_detail_data in mipmap_chain:
                 break
-        self.logger.debug('    offscreen_data:' + str(offscreen_data))
+            mipmap_chain.append(mipmap_detail_data)
+            mipmap_info_id = mipmap_detail_data['next_index']
+
+        return mipmap_chain
+
+    def _get_external_id_from_mipmap_chain(self, mipmap_chain):
+        # 等倍のミップマップ段階 → Offscreen → External ID
+        if len(mipmap_chain) == 0:
+            return None
+
+        offscreen_data = self._get_sqlite_record(
+            'offscreen',
+            mipmap_chain[0]['offscreen'],
+        )
+        if offscreen_data is None:
+            return None
+
+        return offscreen_data['block_data']
+
+    def _freeze_index(self, index_data_dict):
+        # 作成後に変更されないよう、インデックスを読み取り専用のビューに変換して設定
+        # ※他スレッドから作成途中のインデックスを参照しないよう、変換後に設定
+        for attribute_name, index_data in index_data_dict.items():
+            if attribute_name in [
+                    'mipmap_chain_dict',
+                    'layer_name_dict',
+                    'layer_order_dict',
+            ]:
+                index_data = {
+                    key: tuple(value_list)
+                    for key, value_list in index_data.items()
+                }
+            elif attribute_name == 'layer_tree_dict':
+                layer_tree_dict = {}
+                for key, layer_tree_data in index_data.items():
+                    layer_tree_data = dict(layer_tree_data)
+                    layer_tree_data['children_id_list'] = tuple(
+                        layer_tree_data['children_id_list'])
+                    layer_tree_dict[key] = MappingProxyType(layer_tree_data)
+                index_data = layer_tree_dict
+
+            if isinstance(index_data, dict):
+                index_data = MappingProxyType(index_data)
+            setattr(self, attribute_name, index_data)
+
+    def _create_layer_tree_index(self, layer_dict):
+        self.logger.debug('_create_layer_tree_index()')
+
+        # LayerUuid、LayerNameをキーとした辞書
+        layer_uuid_dict = {}
+        layer_name_dict = {}
+        for key, layer_data in layer_dict.items():
+            layer_uuid_dict.setdefault(layer_data['layer_uuid'], key)
+            layer_name_dict.setdefault(layer_data['layer_name'],
+                                       []).append(key)
+
+        # LayerFirstChildIndex/LayerNextIndexを辿り、親子・兄弟関係と
+        # 行きがけ順(下層から上層の順)を作成
+        # ※layer_tree_dict：(Canvas ID, Layer ID) →
+        #   親、子、前後の兄弟、深さ、行きがけ順の位置、部分木の終了位置
+        layer_tree_dict = {}
+        layer_order_dict = {}
+        canvas_layer_dict = {}
+        for canvas_id, layer_id in layer_dict.keys():
+            canvas_layer_dict.setdefault(canvas_id, []).append(layer_id)
+
+        for canvas_id, layer_id_list in canvas_layer_dict.items():
+            layer_order = []
+
+            def walk(layer_id, parent_id, depth):
+                previous_id = None
+                while ((canvas_id, layer_id) in layer_dict
+                       and (canvas_id, layer_id) not in layer_tree_dict):
+                    layer_data = layer_dict[(canvas_id, layer_id)]
+                    layer_tree_data = {
+                        'parent_id': parent_id,
+                        'children_id_list': [],
+                        'previous_id': previous_id,
+                        'next_id': None,
+                        'depth': depth,
+                        'order_index': len(layer_order),
+                        'subtree_end': None,
+                    }
+                    layer_tree_dict[(canvas_id, layer_id)] = layer_tree_data
+                    layer_order.append(layer_id)
+                    if previous_id is not None:
+                        layer_tree_dict[(canvas_id,
+                                         previous_id)]['next_id'] = layer_id
+                    if parent_id is not None:
+                        layer_tree_dict[(
+                            canvas_id,
+                            parent_id)]['children_id_list'].append(layer_id)
+
+                    walk(layer_data['layer_first_child_index'], layer_id,
+                         depth + 1)
+                    layer_tree_data['subtree_end'] = len(layer_order)
+
+                    previous_id = layer_id
+                    layer_id = layer_data['layer_next_index']
+
+            # ルート(他レイヤーから参照されないレイヤー)から辿る
+            # ※循環等で辿れなかったレイヤーは最後にルートとして追加
+            referenced_id_set = set()
+            for layer_id in layer_id_list:
+                layer_data = layer_dict[(canvas_id, layer_id)]
+                referenced_id_set.add(layer_data['layer_next_index'])
+                referenced_id_set.add(layer_data['layer_first_child_index'])
+            for layer_id in layer_id_list:
+                if layer_id not in referenced_id_set:
+                    walk(layer_id, None, 0)
+            for layer_id in layer_id_list:
+                walk(layer_id, None, 0)
+
+            layer_order_dict[canvas_id] = layer_order
+
+        index_data_dict = {
+            'layer_uuid_dict': layer_uuid_dict,
+            'layer_name_dict': layer_name_dict,
+            'layer_tree_dict': layer_tree_dict,
+            'layer_order_dict': layer_order_dict,
+        }
+
+        return index_data_dict
+
+    def _get_external_id(self, canvas_id, layer_id):
+        self.logger.debug('_get_external_id(%s,%s)', canvas_id, layer_id)
 
         # External Data ID
-        external_data_id = offscreen_data['block_data']
-        self.logger.debug('    external_data_id:' + str(external_data_id))
+        # ※インデックス未作成の場合は該当レイヤーのレコードのみを検索
+        if 'external_id' in self._index_set:
+            external_data_id = self.external_id_dict.get(
+                (canvas_id, layer_id))
+        else:
+            external_data_id = None
+            mipmap_chain = self._get_mipmap_chain(canvas_id, layer_id)
+            if mipmap_chain is not None:
+                external_data_id = self._get_external_id_from_mipmap_chain(
+                    mipmap_chain)
+        self.logger.debug('    external_data_id:%s', external_data_id)
 
         return external_data_id
 
     def _get_layer_thumbnail(self, canvas_id, layer_id):
         # LayerThumbnail検索
-        layer_thumbnail_data = None
-        for temp_layer_thumbnail_data in self.layer_thumbnail_list:
-            temp_layer_id = temp_layer_thumbnail_data['main_id']
-            temp_canvas_id = temp_layer_thumbnail_data['canvas_id']
-            if temp_layer_id == layer_id and temp_canvas_id == canvas_id:
-                layer_thumbnail_data = temp_layer_thumbnail_data
-                break
+        layer_thumbnail_data = self._get_sqlite_record(
+            'layer_thumbnail',
+            (canvas_id, layer_id),
+        )
 
         return layer_thumbnail_data
 
-    def _get_layer_external_data(self, external_id):
-        self.logger.debug('_get_layer_external_data(' + str(external_id) + ')')
+    def _clip_roi(self, roi, image_width, image_height):
+        # ROIを画像範囲内に収める(範囲外の場合はNone)
+        x, y, w, h = [int(value) for value in roi]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, image_width), min(y + h, image_height)
+        if x1 <= x0 or y1 <= y0:
+            return None
 
-        # External Data IDを用いて該当のチャンクデータを取得
-        target_chunk_data = None
-        for chunk_data in self.chunk_external_list:
-            if chunk_data['type'] != 'CHNKExta':
-                continue
+        return x0, y0, x1 - x0, y1 - y0
 
-            temp_external_id = self._get_external_id_from_chunk(
-                chunk_data,
-                self.binary_data,
-            )
-            if temp_external_id == external_id:
-                target_chunk_data = chunk_data
-                break
-        self.logger.debug('    target_chunk_data:' + str(target_chunk_data))
+    def _get_block_grid(self, image_width, image_height):
+        # 画像を覆うブロック数(ブロック行数, ブロック列数)を算出
+        tile_size = self._TILE_SIZE
+        blocks_per_row = (image_height + tile_size - 1) // tile_size
+        blocks_per_column = (image_width + tile_size - 1) // tile_size
+
+        return blocks_per_row, blocks_per_column
+
+    def _get_block_range(self, roi):
+        # ROIを含むブロック範囲(開始列, 開始行, 終了列, 終了行)を算出
+        x, y, w, h = roi
+        block_x0 = x // 256
+        block_y0 = y // 256
+        block_x1 = (x + w + 255) // 256
+        block_y1 = (y + h + 255) // 256
+
+        return block_x0, block_y0, block_x1, block_y1
+
+    def _get_block_index_list(self, block_range, image_width):
+        # ブロック範囲内のブロックインデックスを行優先順で列挙
+        _, blocks_per_column = self._get_block_grid(image_width, 0)
+        block_x0, block_y0, block_x1, block_y1 = block_range
+
+        block_index_list = [
+            block_y * blocks_per_column + block_x
+            for block_y in range(block_y0, block_y1)
+            for block_x in range(block_x0, block_x1)
+        ]
+
+        return block_index_list
+
+    def _get_layer_external_data(self, external_id, block_index_list=None):
+        self.logger.debug('_get_layer_external_data(%s)', external_id)
+
+        # External Data IDを用いて該当のチャンクデータを取得
+        target_chunk_data = self.chunk_external_dict.get(external_id)
+        self.logger.debug('    target_chunk_data:%s', target_chunk_data)
 
         # チャンクデータを元にバイナリ情報を取得
         external_data = None
         if target_chunk_data is not None:
             external_data = self._get_external_data_from_chunk(
                 target_chunk_data,
-                self.binary_data,
+                self._get_binary_data(),
+                block_index_list,
             )
         if external_data is not None:
-            self.logger.debug('    external_data size:' +
-                              str(len(external_data)))
+            self.logger.debug('    external_data size:%d',
+                              len(external_data))
 
         return external_data
 
@@ -509,7 +2442,201 @@ class CspTool(object):
 
         return external_id
 
-    def _get_external_data_from_chunk(self, chunk_data, binary_data):
+    def _get_external_data_from_chunk(
+        self,
+        chunk_data,
+        binary_data,
+        block_index_list=None,
+    ):
+        # 1パス目：ブロックヘッダーを走査してブロック情報を収集
+        if self._metrics is not None:
+            start_time = time.perf_counter()
+        block_info_list = self._get_block_info_list(chunk_data, binary_data)
+        if self._metrics is not None:
+            self._metrics.add_time('chunk_scan',
+                                   time.perf_counter() - start_time)
+        block_count = len(block_info_list)
+
+        # 解凍対象ブロックを選択
+        # ※block_index_list指定時は、指定順に該当インデックスのブロックを並べる
+        if block_index_list is not None:
+            block_info_dict = {
+                block_info['block_index']: block_info
+                for block_info in block_info_list
+            }
+            slot_size = 0
+            if len(block_info_list) > 0:
+                slot_size = block_info_list[0]['uncompressed_size']
+            empty_block_info = {
+                'block_index': None,
+                'exist': False,
+                'offset': None,
+                'compressed_size': 0,
+                'uncompressed_size': slot_size,
+            }
+            block_info_list = [
+                block_info_dict.get(block_index, empty_block_info)
+                for block_index in block_index_list
+            ]
+
+        # 解凍しないブロック数(空ブロック、取得範囲外のブロック)
+        if self._metrics is not None:
+            exist_block_count = sum(1 for block_info in block_info_list
+                                    if block_info['exist'])
+            self._metrics.add('tiles_skipped', block_count - exist_block_count)
+
+        # 2パス目：存在するブロックを解凍
+        return self._decompress_block_list(binary_data, block_info_list)
+
+    def _decompress_block_list(self, binary_data, block_info_list):
+        # ブロック情報の順にブロックを解凍して連結したバイト列を取得
+        # ※ブロックヘッダーの走査は行わないため、取得済みのブロック情報を再利用可能
+
+        # 出力バッファを事前確保し、各ブロックの書き込み位置を算出
+        # ※存在しないブロックはゼロ初期化済みの領域をそのまま使用
+        buffer_offset = 0
+        exist_block_list = []
+        for block_info in block_info_list:
+            if block_info['exist']:
+                exist_block_list.append((block_info, buffer_offset, None))
+            buffer_offset += block_info['uncompressed_size']
+        external_data = bytearray(buffer_offset)
+        external_data_view = memoryview(external_data)
+
+        # ディスクキャッシュに存在するブロックは解凍せずに読み出し
+        # ※処理時間はブロック毎ではなく、読み出し全体の経過時間を1回計測
+        if self._tile_disk_cache is not None and len(exist_block_list) > 0:
+            if self._metrics is not None:
+                start_time = time.perf_counter()
+            exist_block_list = self._read_block_list_from_disk_cache(
+                binary_data,
+                exist_block_list,
+                external_data_view,
+            )
+            if self._metrics is not None:
+                self._metrics.add_time('disk_cache_read',
+                                       time.perf_counter() - start_time)
+
+        # 存在するブロックをスレッドプールで解凍
+        # ※zlibは解凍中にGILを解放するため、スレッド並列で高速化可能
+        # ※処理時間はスレッド毎の合計ではなく、解凍全体の経過時間を1回計測
+        def decompress_block(exist_block):
+            block_info, buffer_offset, cache_key = exist_block
+            return self._decompress_block(
+                binary_data,
+                block_info,
+                external_data_view,
+                buffer_offset,
+                cache_key,
+            )
+
+        if self._metrics is not None and len(exist_block_list) > 0:
+            start_time = time.perf_counter()
+        result_list = self._map_block_list(decompress_block, exist_block_list)
+        if self._metrics is not None and len(exist_block_list) > 0:
+            self._metrics.add_time('inflate', time.perf_counter() - start_time)
+
+        # 解凍サイズチェック(ブロック順)
+        for result in result_list:
+            if not result:
+                self.logger.error('_decompress_block_list()')
+                self.logger.error('    Error:Mismatch uncompressed size')
+
+        external_data_view.release()
+
+        return external_data
+
+    def _map_block_list(self, function, block_list):
+        # ブロック毎の処理を実行し、結果をブロック順のリストで返す
+        # ※decode_workersが2以上の場合はスレッドプールで並列実行
+        if self.decode_workers > 1 and len(block_list) > 1:
+            with ThreadPoolExecutor(
+                    max_workers=self.decode_workers) as executor:
+                return list(executor.map(function, block_list))
+
+        return [function(block) for block in block_list]
+
+    def _read_block_list_from_disk_cache(
+        self,
+        binary_data,
+        exist_block_list,
+        output_view,
+    ):
+        # ディスクキャッシュから出力バッファの該当位置へブロックを読み出す
+        # ※戻り値：キャッシュに存在しなかったブロックの
+        #   (ブロック情報, 書き込み位置, キャッシュキー) のリスト
+        def read_block(exist_block):
+            block_info, buffer_offset, _ = exist_block
+            block_offset = block_info['offset']
+            cache_key = self._tile_disk_cache.get_key(
+                binary_data[block_offset:block_offset +
+                            block_info['compressed_size']],
+                block_info['uncompressed_size'],
+            )
+            is_hit = self._tile_disk_cache.read_into(
+                cache_key,
+                output_view,
+                buffer_offset,
+                block_info['uncompressed_size'],
+            )
+            return is_hit, cache_key
+
+        result_list = self._map_block_list(read_block, exist_block_list)
+
+        miss_block_list = []
+        for (block_info, buffer_offset, _), (is_hit, cache_key) in zip(
+                exist_block_list, result_list):
+            if not is_hit:
+                miss_block_list.append((block_info, buffer_offset, cache_key))
+
+        if self._metrics is not None:
+            self._metrics.add('disk_cache_hits',
+                              len(exist_block_list) - len(miss_block_list))
+            self._metrics.add('disk_cache_misses', len(miss_block_list))
+
+        return miss_block_list
+
+    def _decompress_block(
+        self,
+        binary_data,
+        block_info,
+        output_view,
+        output_offset,
+        cache_key=None,
+    ):
+        # ※cache_key：指定時は解凍したブロックをディスクキャッシュへ登録
+        block_offset = block_info['offset']
+        block_uncompressed_size = block_info['uncompressed_size']
+
+        # ブロックデータ取得、解凍
+        # ※確保済みサイズを超えて展開しないよう max_length を指定
+        block_zlib_data = binary_data[block_offset:block_offset +
+                                      block_info['compressed_size']]
+
+        decompressor = zlib.decompressobj()
+        block_data = decompressor.decompress(
+            block_zlib_data,
+            block_uncompressed_size,
+        )
+
+        # 出力バッファの該当位置へ書き込み
+        output_view[output_offset:output_offset + len(block_data)] = block_data
+
+        is_valid = (len(block_data) == block_uncompressed_size
+                    and not decompressor.unconsumed_tail)
+
+        # ディスクキャッシュへ登録(正常に解凍できたブロックのみ)
+        if cache_key is not None and is_valid:
+            self._tile_disk_cache.write(cache_key, block_data)
+
+        if self._metrics is not None:
+            self._metrics.add('compressed_bytes', len(block_zlib_data))
+            self._metrics.add('inflated_bytes', len(block_data))
+            self._metrics.add('tiles_decoded', 1)
+
+        return is_valid
+
+    def _get_block_info_list(self, chunk_data, binary_data):
         offset = chunk_data['chunk_start_position']
 
         # 16バイト：読み飛ばし
@@ -519,17 +2646,14 @@ class CspTool(object):
         chunk_size = struct.unpack_from('>Q', binary_data, offset)[0]
         offset += 8
 
-        # External ID 読み出し
-        external_id = struct.unpack_from(
-            str(chunk_size) + 's', binary_data, offset)[0]
-        external_id = external_id.decode()
+        # External ID 読み飛ばし
         offset += chunk_size
 
         # ビッグエンディアン8バイト：Externalデータサイズ(読み飛ばし)
         # external_data_size = struct.unpack_from('>Q', binary_data, offset)[0]
         offset += 8
 
-        external_data = bytes([])
+        block_info_list = []
         while offset < chunk_data['chunk_end_position']:
             block_start_position = offset
 
@@ -568,8 +2692,8 @@ class CspTool(object):
 
             block_len = 0
             if block_name == 'BlockDataBeginChunk':
-                # ビッグエンディアン4バイト：ブロックインデックス（読み飛ばし）
-                # block_index = struct.unpack_from('>L', binary_data, offset)[0]
+                # ビッグエンディアン4バイト：ブロックインデックス
+                block_index = struct.unpack_from('>L', binary_data, offset)[0]
                 offset += 4
 
                 # ビッグエンディアン4バイト：ブロックサイズ（非圧縮）
@@ -589,6 +2713,14 @@ class CspTool(object):
                 exist_flag = struct.unpack_from('>L', binary_data, offset)[0]
                 offset += 4
 
+                block_info = {
+                    'block_index': block_index,
+                    'exist': exist_flag > 0,
+                    'offset': None,
+                    'compressed_size': 0,
+                    'uncompressed_size': block_uncompressed_size,
+                }
+
                 if exist_flag > 0:
                     # ビッグエンディアン4バイト：ブロック長さ
                     block_len = struct.unpack_from('>L', binary_data,
@@ -604,32 +2736,23 @@ class CspTool(object):
                         self.logger.error('_get_external_data_from_chunk()')
                         self.logger.error('    Error:block length')
 
-                    # ブロックデータ取得、解凍
-                    block_zlib_data = binary_data[offset:offset + block_len_2]
-                    block_data = zlib.decompress(block_zlib_data)
-
-                    # ブロックデータ追加
-                    external_data += block_data
-
-                    if len(block_data) != block_uncompressed_size:
-                        self.logger.error('_get_external_data_from_chunk()')
-                        self.logger.error(
-                            '    Error:Mismatch uncompressed size')
+                    # 圧縮ブロックデータの位置とサイズ
+                    block_info['offset'] = offset
+                    block_info['compressed_size'] = block_len_2
 
                     block_end_position = block_start_position + 24 + block_len
                 else:
-                    # ブロックデータ追加
-                    external_data += bytes(block_uncompressed_size)
-
                     block_end_position = block_start_position + 20
+
+                block_info_list.append(block_info)
             elif block_name == 'BlockStatus' or block_name == 'BlockCheckSum':
                 # ビッグエンディアン4バイト：i0（読み飛ばし）
                 # i0 = struct.unpack_from('>L', binary_data, offset)[0]
                 offset += 4
 
                 # ビッグエンディアン4バイト：ブロックサイズ（非圧縮）
-                block_uncompressed_size = struct.unpack_from(
-                    '>L', binary_data, offset)[0]
+                # block_uncompressed_size = struct.unpack_from(
+                #     '>L', binary_data, offset)[0]
                 offset += 4
 
                 # ビッグエンディアン4バイト：ブロック幅（読み飛ばし）
@@ -654,39 +2777,44 @@ class CspTool(object):
 
             offset = block_end_position
 
-        return external_data
+        return block_info_list
 
     def _get_image_from_external_data(
         self,
         external_data,
         image_width,
         image_height,
+        roi=None,
     ):
         self.logger.debug('_get_image_from_external_data()')
 
+        # 取得範囲(未指定時は画像全体)
+        if roi is None:
+            roi = (0, 0, image_width, image_height)
+        block_x0, block_y0, block_x1, block_y1 = self._get_block_range(roi)
+
         # 各種定数値
-        pixel_size = 4
-        bgr_composite_block_size = 256 * 320 * pixel_size
-        block_size = 256 * 256
-        blocks_per_row = int((image_height + 255) / 256)
-        blocks_per_column = int((image_width + 255) / 256)
+        blocks_per_row = block_y1 - block_y0
+        blocks_per_column = block_x1 - block_x0
         padded_width = blocks_per_column * 256
         padded_height = blocks_per_row * 256
 
         grayscale_expected_size = padded_width * padded_height
-        bgr_expected_size = padded_width * padded_height * (pixel_size + 1)
-
-        self.logger.debug('    pixel_size:' + str(pixel_size))
-        self.logger.debug('    bgr_composite_block_size:' +
-                          str(bgr_composite_block_size))
-        self.logger.debug('    block_size:' + str(block_size))
-        self.logger.debug('    blocks_per_row:' + str(blocks_per_row))
-        self.logger.debug('    blocks_per_column:' + str(blocks_per_column))
-        self.logger.debug('    padded_width:' + str(padded_width))
-        self.logger.debug('    padded_height:' + str(padded_height))
-        self.logger.debug('    grayscale_expected_size:' +
-                          str(grayscale_expected_size))
-        self.logger.debug('    bgr_expected_size:' + str(bgr_expected_size))
+        bgr_expected_size = (padded_width * padded_height *
+                             (self._PIXEL_SIZE + 1))
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug('    pixel_size:%d', self._PIXEL_SIZE)
+            self.logger.debug('    bgr_composite_block_size:%d',
+                              self._BGR_COMPOSITE_BLOCK_SIZE)
+            self.logger.debug('    block_size:%d', self._BLOCK_SIZE)
+            self.logger.debug('    blocks_per_row:%d', blocks_per_row)
+            self.logger.debug('    blocks_per_column:%d', blocks_per_column)
+            self.logger.debug('    padded_width:%d', padded_width)
+            self.logger.debug('    padded_height:%d', padded_height)
+            self.logger.debug('    grayscale_expected_size:%d',
+                              grayscale_expected_size)
+            self.logger.debug('    bgr_expected_size:%d', bgr_expected_size)
 
         # グレースケール画像チェック
         # ToDo：グレースケール画像対応
@@ -699,21 +2827,31 @@ class CspTool(object):
             self.logger.error('    bgr_expected_size:Mismatch Size')
 
         # External Data を 画像に変換
-        bgr_image, alpha_image = self._externaldata2image(
+        if self._metrics is not None:
+            start_time = time.perf_counter()
+        bgr_image, alpha_image, bgra_image = self._externaldata2image(
             external_data,
-            block_size,
+            self._BLOCK_SIZE,
             blocks_per_row,
             blocks_per_column,
-            bgr_composite_block_size,
+            self._BGR_COMPOSITE_BLOCK_SIZE,
         )
-
-        # パディングを削除
+        if self._metrics is not None:
+            self._metrics.add_time('assemble',
+                                   time.perf_counter() - start_time)
+
+        # パディング、取得範囲外を削除
+        x, y, w, h = roi
+        x -= block_x0 * 256
+        y -= block_y0 * 256
         if bgr_image is not None:
-            bgr_image = bgr_image[:image_height, :image_width]
+            bgr_image = bgr_image[y:y + h, x:x + w]
         if alpha_image is not None:
-            alpha_image = alpha_image[:image_height, :image_width]
+            alpha_image = alpha_image[y:y + h, x:x + w]
+        if bgra_image is not None:
+            bgra_image = bgra_image[y:y + h, x:x + w]
 
-        return bgr_image, alpha_image
+        return bgr_image, alpha_image, bgra_image
 
     def _externaldata2image(
         self,
@@ -723,79 +2861,56 @@ class CspTool(object):
         blocks_per_column,
         bgr_composite_block_size,
     ):
-        # 各ブロックデータの画像を保持するリスト
-        bgra_block_list = [[None] * blocks_per_column
-                           for _ in range(blocks_per_row)]
-        alpha_block_list = [[None] * blocks_per_column
-                            for _ in range(blocks_per_row)]
-
         # External Data(バイト列) を Numpy Array 形式に変換
+        # ※(ブロック行, ブロック列, ブロックデータ) のビューとして扱う
+        block_count = blocks_per_row * blocks_per_column
         external_data = np.frombuffer(external_data, dtype=np.uint8)
+        external_data = external_data[:block_count * bgr_composite_block_size]
+        block_data = external_data.reshape(
+            blocks_per_row,
+            blocks_per_column,
+            bgr_composite_block_size,
+        )
 
-        for block_index in range(blocks_per_row * blocks_per_column):
-            # ブロックデータのアドレスと位置を算出
-            block_address = block_index * bgr_composite_block_size
-            block_x = int(block_index % blocks_per_column)
-            block_y = int(block_index / blocks_per_column)
-
-            # 各ブロックデータを取得
-            block = external_data[block_address:block_address +
-                                  bgr_composite_block_size]
-            alpha_block = block[0:block_size]
-            bgra_block = block[block_size:]
-
-            # アルファ画像をリシェイプしてリストに追加
-            alpha_block = alpha_block.reshape(256, 256)
-            alpha_block_list[block_y][block_x] = alpha_block
-
-            # 画像をリシェイプしてリストに追加
-            bgra_block = bgra_block.reshape(256, 256, 4)
-            bgra_block_list[block_y][block_x] = bgra_block
-
-        # アルファ画像を連結
-        alpha_image = None
-        for block_y in range(blocks_per_row):
-            temp_alpha = None
-            for block_x in range(blocks_per_column):
-                if temp_alpha is None:
-                    temp_alpha = alpha_block_list[block_y][block_x]
-                else:
-                    temp_alpha = np.hstack(
-                        [temp_alpha, alpha_block_list[block_y][block_x]])
-            if alpha_image is None:
-                alpha_image = temp_alpha
-            else:
-                alpha_image = np.vstack([alpha_image, temp_alpha])
-
-        # 画像を連結
-        bgra_image = None
-        for block_y in range(blocks_per_row):
-            temp_rgba = None
-            for block_x in range(blocks_per_column):
-                if temp_rgba is None:
-                    temp_rgba = bgra_block_list[block_y][block_x]
-                else:
-                    temp_rgba = np.hstack(
-                        [temp_rgba, bgra_block_list[block_y][block_x]])
-            if bgra_image is None:
-                bgra_image = temp_rgba
-            else:
-                bgra_image = np.vstack([bgra_image, temp_rgba])
-        bgr_image = np.delete(bgra_image, 3, 2)
+        # 各ブロックのアルファ部分と画像部分のビュー
+        # ※(ブロック行, ブロック内y, ブロック列, ブロック内x) の順に並べ替え
+        alpha_blocks = block_data[:, :, :block_size].reshape(
+            blocks_per_row, blocks_per_column, 256, 256)
+        alpha_blocks = alpha_blocks.transpose(0, 2, 1, 3)
+        bgra_blocks = block_data[:, :, block_size:].reshape(
+            blocks_per_row, blocks_per_column, 256, 256, 4)
+        bgra_blocks = bgra_blocks.transpose(0, 2, 1, 3, 4)
+
+        # アルファ画像を連結(1回のコピー)
+        alpha_image = np.empty(
+            (blocks_per_row * 256, blocks_per_column * 256),
+            dtype=np.uint8,
+        )
+        alpha_image.reshape(alpha_blocks.shape)[...] = alpha_blocks
+
+        # 画像を連結(1回のコピー)
+        # ※4チャンネル目にはアルファ画像を格納し、BGR画像はBGRA画像とは
+        #   別の連続した配列とする(OpenCVの描画関数で直接使用可能)
+        bgra_image = np.empty(
+            (blocks_per_row * 256, blocks_per_column * 256, 4),
+            dtype=np.uint8,
+        )
+        bgra_image.reshape(bgra_blocks.shape)[..., :3] = bgra_blocks[..., :3]
+        bgra_image[:, :, 3] = alpha_image
+        bgr_image = np.ascontiguousarray(bgra_image[:, :, :3])
 
-        return bgr_image, alpha_image
+        return bgr_image, alpha_image, bgra_image
 
     def set_debug_level(
             self,
             log_filename=None,
             debug_level='WARNING',  # 'DEBUG', 'INFO', 'ERROR', 'CRITICAL'
     ):
+        # ※ルートロガーは呼び出し元アプリケーションの設定を保つため変更しない
         if debug_level == 'DEBUG':
             self.logger.setLevel(logging.DEBUG)
-            logging.basicConfig(filename=log_filename, level=logging.DEBUG)
         elif debug_level == 'INFO':
             self.logger.setLevel(logging.INFO)
-            logging.basicConfig(filename=log_filename, level=logging.INFO)
         elif debug_level == 'WARNING':
             self.logger.setLevel(logging.WARNING)
         elif debug_level == 'ERROR':
@@ -803,6 +2918,65 @@ class CspTool(object):
         elif debug_level == 'CRITICAL':
             self.logger.setLevel(logging.CRITICAL)
 
+        # ログファイル指定時は本ロガーにのみファイルハンドラーを追加
+        if log_filename is not None:
+            log_filepath = os.path.abspath(log_filename)
+            for handler in self.logger.handlers:
+                if isinstance(handler, logging.FileHandler) and \
+                        handler.baseFilename == log_filepath:
+                    break
+            else:
+                handler = logging.FileHandler(log_filename)
+                handler.setFormatter(
+                    logging.Formatter('%(levelname)s:%(name)s:%(message)s'))
+                self.logger.addHandler(handler)
+        # DEBUG/INFO指定時、出力先が未設定であれば標準エラー出力に出力
+        elif debug_level in ['DEBUG', 'INFO'] and \
+                not self.logger.hasHandlers():
+            handler = logging.StreamHandler()
+            handler.setFormatter(
+                logging.Formatter('%(levelname)s:%(name)s:%(message)s'))
+            self.logger.addHandler(handler)
+
+
+# プロセスプール用ワーカー状態
+_worker_csp_tool = None
+
+
+def _init_raster_worker(
+    filepath,
+    chunk_external_dict,
+    logger_name,
+    disk_cache_info=None,
+):
+    global _worker_csp_tool
+
+    disk_cache_dir, disk_cache_size = None, 0
+    if disk_cache_info is not None:
+        disk_cache_dir = disk_cache_info['cache_dir']
+        disk_cache_size = disk_cache_info['max_size']
+
+    _worker_csp_tool = CspTool._for_worker(
+        filepath,
+        chunk_external_dict,
+        logger_name=logger_name,
+        disk_cache_dir=disk_cache_dir,
+        disk_cache_size=disk_cache_size,
+    )
+
+
+def _decode_raster_worker(job):
+    external_id, image_width, image_height = job
+
+    # BGRA画像のみを返却(BGR画像とアルファ画像は呼び出し元で復元)
+    raster_data = _worker_csp_tool._get_raster_data_from_external_id(
+        external_id,
+        image_width,
+        image_height,
+    )
+
+    return raster_data[2]
+
 
 if __name__ == '__main__':
     csp_tool = CspTool(
@@ -0,0 +1,436 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import random
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from csp_benchmark import write_synthetic_clip
+from csp_tool import CspTool
+
+TEST_CLIP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              'test.clip')
+
+# ブロック関連の定数
+BLOCK_SIZE = 256 * 256
+BGR_COMPOSITE_BLOCK_SIZE = 256 * 320 * 4
+
+
+def old_externaldata2image(
+    external_data,
+    block_size,
+    blocks_per_row,
+    blocks_per_column,
+    bgr_composite_block_size,
+):
+    # 比較用：np.hstack/np.vstackで連結する従来の実装
+    bgra_block_list = [[None] * blocks_per_column
+                       for _ in range(blocks_per_row)]
+    alpha_block_list = [[None] * blocks_per_column
+                        for _ in range(blocks_per_row)]
+
+    external_data = np.frombuffer(external_data, dtype=np.uint8)
+
+    for block_index in range(blocks_per_row * blocks_per_column):
+        block_address = block_index * bgr_composite_block_size
+        block_x = int(block_index % blocks_per_column)
+        block_y = int(block_index / blocks_per_column)
+
+        block = external_data[block_address:block_address +
+                              bgr_composite_block_size]
+        alpha_block = block[0:block_size]
+        bgra_block = block[block_size:]
+
+        alpha_block_list[block_y][block_x] = alpha_block.reshape(256, 256)
+        bgra_block_list[block_y][block_x] = bgra_block.reshape(256, 256, 4)
+
+    alpha_image = None
+    for block_y in range(blocks_per_row):
+        temp_alpha = None
+        for block_x in range(blocks_per_column):
+            if temp_alpha is None:
+                temp_alpha = alpha_block_list[block_y][block_x]
+            else:
+                temp_alpha = np.hstack(
+                    [temp_alpha, alpha_block_list[block_y][block_x]])
+        if alpha_image is None:
+            alpha_image = temp_alpha
+        else:
+            alpha_image = np.vstack([alpha_image, temp_alpha])
+
+    bgra_image = None
+    for block_y in range(blocks_per_row):
+        temp_rgba = None
+        for block_x in range(blocks_per_column):
+            if temp_rgba is None:
+                temp_rgba = bgra_block_list[block_y][block_x]
+            else:
+                temp_rgba = np.hstack(
+                    [temp_rgba, bgra_block_list[block_y][block_x]])
+        if bgra_image is None:
+            bgra_image = temp_rgba
+        else:
+            bgra_image = np.vstack([bgra_image, temp_rgba])
+    bgr_image = np.delete(bgra_image, 3, 2)
+
+    return bgr_image, alpha_image
+
+
+def get_raster_layer_list(csp_tool):
+    # External Dataが存在するレイヤーの (Canvas ID, Layer ID, 幅, 高さ) 一覧
+    raster_layer_list = []
+    for layer_data in csp_tool.get_layer_list():
+        canvas_id = layer_data['canvas_id']
+        layer_id = layer_data['main_id']
+        external_id = csp_tool._get_external_id(canvas_id, layer_id)
+        if external_id not in csp_tool.chunk_external_dict:
+            continue
+        layer_thumbnail_data = csp_tool._get_layer_thumbnail(
+            canvas_id,
+            layer_id,
+        )
+        raster_layer_list.append((
+            canvas_id,
+            layer_id,
+            layer_thumbnail_data['thumbnail_canvas_width'],
+            layer_thumbnail_data['thumbnail_canvas_height'],
+        ))
+
+    return raster_layer_list
+
+
+def assert_same_image(image, expected_image):
+    assert image.shape == expected_image.shape
+    assert image.dtype == expected_image.dtype
+    assert image.tobytes() == expected_image.tobytes()
+
+
+def test_externaldata2image_matches_old_implementation():
+    csp_tool = CspTool(TEST_CLIP_PATH)
+    raster_layer_list = get_raster_layer_list(csp_tool)
+    assert len(raster_layer_list) > 0
+
+    for canvas_id, layer_id, image_width, image_height in raster_layer_list:
+        external_id = csp_tool._get_external_id(canvas_id, layer_id)
+        external_data = csp_tool._get_layer_external_data(external_id)
+        blocks_per_row = (image_height + 255) // 256
+        blocks_per_column = (image_width + 255) // 256
+
+        # 従来の実装
+        old_bgr, old_alpha = old_externaldata2image(
+            external_data,
+            BLOCK_SIZE,
+            blocks_per_row,
+            blocks_per_column,
+            BGR_COMPOSITE_BLOCK_SIZE,
+        )
+
+        # 現在の実装(パディングを含む画像)
+        bgr, alpha, bgra = csp_tool._externaldata2image(
+            external_data,
+            BLOCK_SIZE,
+            blocks_per_row,
+            blocks_per_column,
+            BGR_COMPOSITE_BLOCK_SIZE,
+        )
+        assert_same_image(bgr, old_bgr)
+        assert_same_image(alpha, old_alpha)
+        assert_same_image(bgra[:, :, :3], old_bgr)
+        assert_same_image(bgra[:, :, 3], old_alpha)
+
+        # get_raster_data()の結果
+        # ※パディング削除、BGRA結合は従来のget_raster_data()と同様
+        old_bgr = old_bgr[:image_height, :image_width]
+        old_alpha = old_alpha[:image_height, :image_width]
+        old_bgra = np.concatenate(
+            [old_bgr, old_alpha.reshape([*old_alpha.shape, 1])], 2)
+        bgr, alpha, bgra = csp_tool.get_raster_data(canvas_id, layer_id)
+        assert_same_image(bgr, old_bgr)
+        assert_same_image(alpha, old_alpha)
+        assert_same_image(bgra, old_bgra)
+
+
+def get_operation_list(csp_tool):
+    # 並列実行する取得処理の一覧(名前, 関数)
+    operation_list = []
+    for canvas_id, layer_id, _, _ in get_raster_layer_list(csp_tool):
+        for roi in [None, (100, 150, 300, 200)]:
+            for scale in [None, 50.0]:
+                operation_list.append((
+                    ('raster', canvas_id, layer_id, roi, scale),
+                    lambda csp_tool, canvas_id=canvas_id, layer_id=layer_id,
+                    roi=roi, scale=scale: csp_tool.get_raster_data(
+                        canvas_id, layer_id, roi=roi, scale=scale),
+                ))
+    operation_list.append((
+        ('thumbnail', ),
+        lambda csp_tool: (csp_tool.get_thumbnail_image(), ),
+    ))
+    for layer_data in csp_tool.get_layer_list():
+        canvas_id = layer_data['canvas_id']
+        layer_id = layer_data['main_id']
+        operation_list.append((
+            ('tree', canvas_id, layer_id),
+            lambda csp_tool, canvas_id=canvas_id, layer_id=layer_id: (
+                csp_tool.get_layer_parent(canvas_id, layer_id),
+                csp_tool.get_layer_children(canvas_id, layer_id),
+                csp_tool.get_layer_subtree(canvas_id, layer_id),
+                list(csp_tool.iter_layer_tree(canvas_id)),
+            ),
+        ))
+
+    return operation_list
+
+
+def assert_same_result(result, expected_result):
+    assert len(result) == len(expected_result)
+    for value, expected_value in zip(result, expected_result):
+        if isinstance(expected_value, np.ndarray):
+            assert_same_image(value, expected_value)
+        else:
+            assert value == expected_value
+
+
+@pytest.mark.parametrize('option_name', [
+    'default',
+    'mmap_lazy_load',
+    'cache_size',
+    'disk_cache_dir',
+])
+def test_shared_instance_thread_safety(option_name, tmp_path):
+    option_dict = {
+        'default': {},
+        'mmap_lazy_load': {
+            'use_mmap': True,
+            'lazy_load': True,
+        },
+        'cache_size': {
+            'cache_size': 64 * 1024 * 1024,
+        },
+        'disk_cache_dir': {
+            'disk_cache_dir': str(tmp_path / 'tile_cache'),
+        },
+    }[option_name]
+    thread_count = 16
+    call_count = 400
+
+    # 逐次処理の結果
+    serial_csp_tool = CspTool(TEST_CLIP_PATH)
+    operation_list = get_operation_list(serial_csp_tool)
+    expected_result_dict = {
+        key: operation(serial_csp_tool)
+        for key, operation in operation_list
+    }
+
+    # 未読み出し(遅延読み出し)の状態のインスタンスを複数スレッドで共有
+    csp_tool = CspTool(TEST_CLIP_PATH, **option_dict)
+    barrier = threading.Barrier(thread_count)
+    error_list = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        barrier.wait()
+        try:
+            for _ in range(call_count // thread_count):
+                key, operation = rng.choice(operation_list)
+                assert_same_result(
+                    operation(csp_tool),
+                    expected_result_dict[key],
+                )
+        except Exception as exception:
+            error_list.append(exception)
+
+    thread_list = [
+        threading.Thread(target=worker, args=(seed, ))
+        for seed in range(thread_count)
+    ]
+    for thread in thread_list:
+        thread.start()
+    for thread in thread_list:
+        thread.join()
+
+    csp_tool.close()
+
+    assert error_list == []
+
+
+@pytest.mark.parametrize('option_dict', [
+    {},
+    {
+        'use_mmap': True,
+    },
+    {
+        'use_mmap': True,
+        'lazy_load': True,
+    },
+])
+def test_use_after_close_raises(option_dict):
+    csp_tool = CspTool(TEST_CLIP_PATH, **option_dict)
+    canvas_id, layer_id, _, _ = get_raster_layer_list(csp_tool)[0]
+    csp_tool.get_raster_data(canvas_id, layer_id)
+    csp_tool.close()
+
+    # close()後はファイルを開き直さずに例外を送出
+    with pytest.raises(ValueError):
+        csp_tool.get_raster_data(canvas_id, layer_id)
+    with pytest.raises(ValueError):
+        csp_tool.get_thumbnail_image()
+    assert csp_tool.binary_data is None
+
+
+def test_composite_matches_canvas_preview():
+    # 用紙(白)の上に合成した結果がキャンバスプレビューと一致すること
+    csp_tool = CspTool(TEST_CLIP_PATH)
+    thumbnail_image = csp_tool.get_thumbnail_image()
+    bgr_image, alpha_image, _ = csp_tool.composite(1)
+    assert bgr_image.shape == thumbnail_image.shape
+
+    alpha = alpha_image[:, :, np.newaxis].astype(np.float64) / 255
+    composite_image = bgr_image * alpha + 255 * (1 - alpha)
+    difference = np.abs(composite_image - thumbnail_image.astype(np.float64))
+    assert difference.max() <= 1
+
+
+def test_composite_layer_opacity(tmp_path):
+    filepath = str(tmp_path / 'opacity.clip')
+    write_synthetic_clip(
+        filepath,
+        canvas_width=300,
+        canvas_height=300,
+        layer_count=2,
+        sparsity=0.3,
+        layer_opacity=128,
+    )
+    csp_tool = CspTool(filepath)
+    canvas_id = 1
+
+    # 比較用：各レイヤーのアルファに不透明度(128/256)を乗算して通常合成
+    expected_bgr = np.zeros((300, 300, 3), dtype=np.float64)
+    expected_alpha = np.zeros((300, 300), dtype=np.float64)
+    for canvas_id, layer_id, _, _ in get_raster_layer_list(csp_tool):
+        bgr, alpha, _ = csp_tool.get_raster_data(canvas_id, layer_id)
+        src_alpha = alpha.astype(np.float64) / 255 * 128 / 256
+        expected_bgr = (bgr / 255 * src_alpha[:, :, np.newaxis] +
+                        expected_bgr * (1 - src_alpha[:, :, np.newaxis]))
+        expected_alpha = src_alpha + expected_alpha * (1 - src_alpha)
+    np.divide(
+        expected_bgr,
+        expected_alpha[:, :, np.newaxis],
+        out=expected_bgr,
+        where=expected_alpha[:, :, np.newaxis] > 0,
+    )
+
+    bgr, alpha, _ = csp_tool.composite(canvas_id)
+    assert alpha.max() < 255
+    assert np.abs(alpha - expected_alpha * 255).max() <= 1
+    assert np.abs(bgr - expected_bgr * 255).max() <= 1
+
+
+def test_raster_data_bgr_is_contiguous_copy():
+    # BGR画像はBGRA画像とは別の連続した配列(OpenCVで直接描画可能)
+    csp_tool = CspTool(TEST_CLIP_PATH)
+    for canvas_id, layer_id, _, _ in get_raster_layer_list(csp_tool):
+        for roi in [None, (100, 150, 300, 200)]:
+            bgr, _, bgra = csp_tool.get_raster_data(
+                canvas_id,
+                layer_id,
+                roi=roi,
+            )
+            assert not np.shares_memory(bgr, bgra)
+            expected_bgra = bgra.copy()
+            cv2.rectangle(bgr, (10, 10), (50, 50), (0, 0, 255), -1)
+            cv2.putText(bgr, 'test', (0, 100), cv2.FONT_HERSHEY_SIMPLEX,
+                        1, (255, 0, 0))
+            assert_same_image(bgra, expected_bgra)
+
+
+@pytest.mark.parametrize('cache_size, writeable', [
+    (0, True),
+    (64 * 1024 * 1024, False),
+    (1, False),  # 上限超過(キャッシュしない)
+])
+def test_raster_data_writeable_with_cache(cache_size, writeable):
+    # キャッシュ有効時は初回取得、キャッシュ取得、上限超過のいずれも読み取り専用
+    csp_tool = CspTool(TEST_CLIP_PATH, cache_size=cache_size)
+    canvas_id, layer_id, _, _ = get_raster_layer_list(csp_tool)[0]
+    for _ in range(2):
+        raster_data = csp_tool.get_raster_data(canvas_id, layer_id)
+        for image in raster_data:
+            assert image.flags.writeable == writeable
+
+
+@pytest.mark.parametrize('key', [
+    np.s_[:, :],
+    np.s_[::-1],
+    np.s_[300:10:-7],
+    np.s_[-5],
+    np.s_[-5, 10],
+    np.s_[100:400, 50:600],
+    np.s_[::3, ::-5],
+    np.s_[10:10],
+    np.s_[:, 500:100],
+    np.s_[200:300, -300:-20, 3],
+    np.s_[[1, 5, 7], :],
+    np.s_[..., 0],
+])
+def test_layer_array_matches_raster_data(key):
+    csp_tool = CspTool(TEST_CLIP_PATH)
+    for canvas_id, layer_id, _, _ in get_raster_layer_list(csp_tool):
+        _, _, bgra = csp_tool.get_raster_data(canvas_id, layer_id)
+        layer_array = csp_tool.get_layer_array(canvas_id, layer_id)
+        assert layer_array.shape == bgra.shape
+        assert_same_image(np.asarray(layer_array[key]), bgra[key])
+        assert_same_image(np.asarray(layer_array), bgra)
+
+
+@pytest.mark.parametrize('roi', [
+    (100, 150, 300, 200),
+    (0, 0, 1, 1),
+    (-50, -30, 200, 100),
+    (250, 300, 10000, 10000),
+    (-10, -10, 10000, 10000),
+])
+def test_roi_matches_raster_data(roi):
+    csp_tool = CspTool(TEST_CLIP_PATH)
+    for canvas_id, layer_id, _, _ in get_raster_layer_list(csp_tool):
+        full_raster_data = csp_tool.get_raster_data(canvas_id, layer_id)
+
+        # 画像範囲外の部分を除いた範囲と一致すること
+        x, y, w, h = roi
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = x + w, y + h
+        raster_data = csp_tool.get_raster_data(canvas_id, layer_id, roi=roi)
+        for image, full_image in zip(raster_data, full_raster_data):
+            assert_same_image(image, full_image[y0:y1, x0:x1])
+
+
+def test_iter_tiles_reassemble():
+    csp_tool = CspTool(TEST_CLIP_PATH)
+    for canvas_id, layer_id, _, _ in get_raster_layer_list(csp_tool):
+        bgr, alpha, _ = csp_tool.get_raster_data(canvas_id, layer_id)
+        for skip_empty in [False, True]:
+            tile_bgr = np.zeros_like(bgr)
+            tile_alpha = np.zeros_like(alpha)
+            for tile_x, tile_y, bgr_tile, alpha_tile in csp_tool.iter_tiles(
+                    canvas_id,
+                    layer_id,
+                    skip_empty=skip_empty,
+            ):
+                x, y = tile_x * 256, tile_y * 256
+                h, w = alpha_tile.shape
+                tile_bgr[y:y + h, x:x + w] = bgr_tile
+                tile_alpha[y:y + h, x:x + w] = alpha_tile
+            assert_same_image(tile_bgr, bgr)
+            assert_same_image(tile_alpha, alpha)
+
+
+def test_export_layer_npy(tmp_path):
+    csp_tool = CspTool(TEST_CLIP_PATH)
+    for canvas_id, layer_id, _, _ in get_raster_layer_list(csp_tool):
+        _, _, bgra = csp_tool.get_raster_data(canvas_id, layer_id)
+        path = str(tmp_path / 'layer_{}_{}.npy'.format(canvas_id, layer_id))
+        assert csp_tool.export_layer(canvas_id, layer_id, path)
+        assert_same_image(np.load(path), bgra)